@@ -5,191 +5,68 @@ Author: Eman Elgamal
 """
 
 import os
+import logging
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from email.mime.image import MIMEImage
+import atexit
+from operator import itemgetter
 from datetime import datetime
-import glob
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def create_dashboard_charts(jobs_data):
-    """Create beautiful charts and save as images"""
-    
-    print("📊 Creating dashboard charts...")
-    
-    df = pd.DataFrame(jobs_data)
-    
-    # Create charts directory
-    os.makedirs('reports/charts', exist_ok=True)
-    
-    chart_files = []
-    
-    try:
-        # Chart 1: Jobs by Category
-        category_counts = df.groupby('category').size().reset_index(name='count')
-        category_counts['category_display'] = category_counts['category'].str.replace('_', ' ').str.title()
-        
-        fig1 = px.bar(
-            category_counts, 
-            x='category_display', 
-            y='count',
-            title="📊 Jobs by Category",
-            color='count',
-            color_continuous_scale='viridis',
-            text='count'
-        )
-        fig1.update_traces(texttemplate='%{text}', textposition='outside')
-        fig1.update_layout(
-            font=dict(size=14),
-            title_font_size=20,
-            showlegend=False,
-            height=500
-        )
-        
-        chart1_path = 'reports/charts/jobs_by_category.png'
-        fig1.write_image(chart1_path, width=900, height=500)
-        chart_files.append(('Jobs by Category', chart1_path))
-        
-        # Chart 2: Work Mode Distribution
-        work_mode_counts = df['work_mode'].value_counts()
-        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
-        
-        fig2 = px.pie(
-            values=work_mode_counts.values,
-            names=work_mode_counts.index,
-            title="🏠 Work Mode Distribution",
-            color_discrete_sequence=colors
-        )
-        fig2.update_traces(textposition='inside', textinfo='percent+label', textfont_size=14)
-        fig2.update_layout(
-            font=dict(size=14),
-            title_font_size=20,
-            height=500
-        )
-        
-        chart2_path = 'reports/charts/work_mode_distribution.png'
-        fig2.write_image(chart2_path, width=900, height=500)
-        chart_files.append(('Work Mode Distribution', chart2_path))
-        
-        # Chart 3: Experience Level Distribution
-        exp_counts = df['experience_level'].value_counts()
-        
-        fig3 = px.bar(
-            x=exp_counts.values,
-            y=exp_counts.index,
-            orientation='h',
-            title="👥 Experience Level Distribution",
-            color=exp_counts.values,
-            color_continuous_scale='blues',
-            text=exp_counts.values
-        )
-        fig3.update_traces(texttemplate='%{text}', textposition='outside')
-        fig3.update_layout(
-            font=dict(size=14),
-            title_font_size=20,
-            showlegend=False,
-            height=400
-        )
-        
-        chart3_path = 'reports/charts/experience_level.png'
-        fig3.write_image(chart3_path, width=900, height=400)
-        chart_files.append(('Experience Level', chart3_path))
-        
-        # Chart 4: Top Companies (if available)
-        if df['company'].nunique() > 1 and len(df[df['company'] != 'N/A']) > 0:
-            company_counts = df[df['company'] != 'N/A']['company'].value_counts().head(10)
-            
-            fig4 = px.bar(
-                x=company_counts.values,
-                y=company_counts.index,
-                orientation='h',
-                title="🏢 Top Hiring Companies",
-                color=company_counts.values,
-                color_continuous_scale='greens',
-                text=company_counts.values
-            )
-            fig4.update_traces(texttemplate='%{text}', textposition='outside')
-            fig4.update_layout(
-                font=dict(size=12),
-                title_font_size=20,
-                showlegend=False,
-                height=500
-            )
-            
-            chart4_path = 'reports/charts/top_companies.png'
-            fig4.write_image(chart4_path, width=900, height=500)
-            chart_files.append(('Top Companies', chart4_path))
-        
-        print(f"✅ Created {len(chart_files)} dashboard charts")
-        return chart_files
-        
-    except Exception as e:
-        print(f"❌ Chart creation failed: {e}")
-        print("💡 Make sure to install: pip install kaleido")
-        return []
+logger = logging.getLogger(__name__)
 
-def send_enhanced_dashboard_email(jobs_data, analytics):
-    """Send beautiful HTML email with dashboard charts"""
-    
-    print("\n📧 Creating Enhanced Dashboard Email...")
-    
-    try:
-        # Email configuration
-        sender_email = os.getenv('SENDER_EMAIL')
-        sender_password = os.getenv('SENDER_PASSWORD')
-        recipient_email = os.getenv('RECIPIENT_EMAIL')
-        
-        if not all([sender_email, sender_password, recipient_email]):
-            print("❌ Email configuration incomplete")
-            return False
-        
-        # Create charts
-        chart_files = create_dashboard_charts(jobs_data)
-        
-        # Create email
-        msg = MIMEMultipart('related')
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = f"📊 Data Jobs Intelligence Dashboard - {datetime.now().strftime('%Y-%m-%d')}"
-        
-        # Create HTML email body
-        html_body = f"""
+# Columns the email report reads from the scraped CSVs
+REPORT_COLUMNS = ['category', 'work_mode', 'experience_level', 'job_type', 'company', 'source']
+
+# Low-cardinality columns kept as categoricals from load onwards
+CATEGORY_COLUMNS = ['category', 'work_mode', 'experience_level', 'job_type', 'source']
+
+# Scraper output files the report can be built from
+JOB_FILE_PREFIXES = ('production_jobs_', 'enhanced_jobs_')
+
+# Accent colours for the work mode breakdown in the email
+WORK_MODE_COLORS = {'Remote': '#28a745', 'Hybrid': '#ffc107', 'On-site': '#dc3545'}
+
+SMTP_HOST = 'smtp.gmail.com'
+SMTP_SSL_PORT = 465
+
+_smtp_conn = None
+
+# Static document preamble; it has no placeholders, so it is built once at import
+_HTML_HEAD = """
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="UTF-8">
             <style>
-                body {{ 
+                body { 
                     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
                     line-height: 1.6; 
                     color: #333; 
                     max-width: 800px;
                     margin: 0 auto;
                     background-color: #f8f9fa;
-                }}
-                .container {{
+                }
+                .container {
                     background-color: white;
                     padding: 20px;
                     border-radius: 10px;
                     box-shadow: 0 4px 6px rgba(0,0,0,0.1);
                     margin: 20px;
-                }}
-                .header {{ 
+                }
+                .header { 
                     background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                     color: white; 
                     padding: 30px; 
                     text-align: center; 
                     border-radius: 10px;
                     margin-bottom: 30px;
-                }}
-                .metric {{ 
+                }
+                .metric { 
                     background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
                     color: white;
                     padding: 20px; 
@@ -199,45 +76,276 @@ def send_enhanced_dashboard_email(jobs_data, analytics):
                     min-width: 150px;
                     text-align: center;
                     font-weight: bold;
-                }}
-                .section {{ 
+                }
+                .section { 
                     margin: 30px 0; 
                     padding: 20px;
                     background-color: #f8f9fa;
                     border-radius: 10px;
-                }}
-                .chart-container {{
+                }
+                .chart-container {
                     text-align: center;
                     margin: 20px 0;
                     padding: 15px;
                     background-color: white;
                     border-radius: 10px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .chart-image {{
+                }
+                .chart-image {
                     max-width: 100%;
                     height: auto;
                     border-radius: 8px;
-                }}
-                .insight {{
+                }
+                .insight {
                     background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
                     padding: 15px;
                     border-radius: 10px;
                     margin: 15px 0;
                     border-left: 5px solid #007bff;
-                }}
-                .footer {{
+                }
+                .footer {
                     text-align: center;
                     padding: 20px;
                     color: #666;
                     border-top: 1px solid #eee;
                     margin-top: 30px;
-                }}
-                h1, h2, h3 {{ color: #2c3e50; }}
-                .emoji {{ font-size: 1.2em; }}
+                }
+                h1, h2, h3 { color: #2c3e50; }
+                .emoji { font-size: 1.2em; }
             </style>
         </head>
         <body>
+"""
+
+# Closing footer; only the processing time changes per email
+_HTML_FOOT_TEMPLATE = """
+                    </ul>
+                </div>
+                
+                <div class="footer">
+                    <p><strong>Data Jobs Intelligence Pipeline</strong></p>
+                    <p>Automated Job Market Analysis | Built with ❤️ by Eman Elgamal</p>
+                    <p>Next Report: Tomorrow at 9:00 AM</p>
+                    <p style="font-size: 12px; color: #999;">
+                        Data Source: Glassdoor, Indeed | Processing Time: {now}
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+def count_columns(df, columns):
+    """Count the values of each column in one pass over its categorical codes"""
+    
+    counts = {}
+    for column in columns:
+        values = df[column]
+        if values.dtype.name != 'category':
+            values = values.astype('category')
+        
+        column_counts = values.value_counts()
+        counts[column] = column_counts[column_counts > 0]
+    
+    return counts
+
+def scale_colors(cmap_name, values):
+    """Map bar values onto a matplotlib colormap, darkest for the largest"""
+    
+    import matplotlib
+    
+    cmap = matplotlib.colormaps[cmap_name]
+    top = max(values) or 1
+    return [cmap(0.3 + 0.7 * value / top) for value in values]
+
+def new_chart(width, height):
+    """Create an Agg-rendered figure; matplotlib is only imported once charts are drawn"""
+    
+    from matplotlib.figure import Figure
+    
+    return Figure(figsize=(width, height))
+
+def save_chart(fig, chart_path):
+    """Write a chart figure to PNG with the Agg renderer"""
+    
+    fig.tight_layout()
+    fig.savefig(chart_path, dpi=100)
+
+def render_category_chart(jobs_by_category):
+    """Render the jobs-by-category bar chart"""
+    
+    categories = sorted(jobs_by_category)
+    labels = [category.replace('_', ' ').title() for category in categories]
+    values = [jobs_by_category[category] for category in categories]
+    
+    fig = new_chart(9, 5)
+    ax = fig.subplots()
+    bars = ax.bar(labels, values, color=scale_colors('viridis', values))
+    ax.bar_label(bars, fontsize=14)
+    ax.set_title("Jobs by Category", fontsize=20)
+    ax.tick_params(labelsize=14)
+    ax.margins(y=0.15)
+    
+    chart_path = 'reports/charts/jobs_by_category.png'
+    save_chart(fig, chart_path)
+    return ('Jobs by Category', chart_path)
+
+def render_work_mode_chart(jobs_by_work_mode):
+    """Render the work mode distribution pie chart"""
+    
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+    
+    fig = new_chart(9, 5)
+    ax = fig.subplots()
+    ax.pie(
+        list(jobs_by_work_mode.values()),
+        labels=list(jobs_by_work_mode.keys()),
+        colors=colors[:len(jobs_by_work_mode)],
+        autopct='%1.1f%%',
+        textprops={'fontsize': 14}
+    )
+    ax.set_title("Work Mode Distribution", fontsize=20)
+    
+    chart_path = 'reports/charts/work_mode_distribution.png'
+    save_chart(fig, chart_path)
+    return ('Work Mode Distribution', chart_path)
+
+def render_experience_chart(jobs_by_experience):
+    """Render the experience level bar chart"""
+    
+    values = list(jobs_by_experience.values())
+    
+    fig = new_chart(9, 4)
+    ax = fig.subplots()
+    bars = ax.barh(list(jobs_by_experience.keys()), values, color=scale_colors('Blues', values))
+    ax.bar_label(bars, fontsize=14)
+    ax.set_title("Experience Level Distribution", fontsize=20)
+    ax.tick_params(labelsize=14)
+    ax.margins(x=0.1)
+    
+    chart_path = 'reports/charts/experience_level.png'
+    save_chart(fig, chart_path)
+    return ('Experience Level', chart_path)
+
+def render_top_companies_chart(top_companies):
+    """Render the top hiring companies bar chart"""
+    
+    values = list(top_companies.values())
+    
+    fig = new_chart(9, 5)
+    ax = fig.subplots()
+    bars = ax.barh(list(top_companies.keys()), values, color=scale_colors('Greens', values))
+    ax.bar_label(bars, fontsize=12)
+    ax.set_title("Top Hiring Companies", fontsize=20)
+    ax.tick_params(labelsize=12)
+    ax.margins(x=0.1)
+    
+    chart_path = 'reports/charts/top_companies.png'
+    save_chart(fig, chart_path)
+    return ('Top Companies', chart_path)
+
+def create_dashboard_charts(analytics):
+    """Create beautiful charts from the precomputed analytics and save as images"""
+    
+    logger.info("📊 Creating dashboard charts...")
+    
+    # Create charts directory
+    os.makedirs('reports/charts', exist_ok=True)
+    
+    try:
+        rendered = [
+            render_category_chart(analytics['jobs_by_category']),
+            render_work_mode_chart(analytics['jobs_by_work_mode']),
+            render_experience_chart(analytics['jobs_by_experience'])
+        ]
+        
+        # Top Companies (if more than one known company is hiring)
+        if len(analytics['top_companies']) > 1:
+            rendered.append(render_top_companies_chart(analytics['top_companies']))
+        
+        # One Content-ID per chart, shared by the <img> tag and the MIME part
+        chart_files = [(title, title.lower().replace(' ', '_'), path) for title, path in rendered]
+        
+        logger.info("✅ Created %d dashboard charts", len(chart_files))
+        return chart_files
+        
+    except Exception as e:
+        logger.error("❌ Chart creation failed: %s", e)
+        logger.error("💡 Make sure to install: pip install matplotlib")
+        return []
+
+def get_smtp_connection(sender_email, sender_password):
+    """Return a logged-in SMTP connection, reusing the open one while it is alive"""
+    
+    global _smtp_conn
+    
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPServerDisconnected, OSError):
+            pass
+        _smtp_conn = None
+    
+    # Implicit TLS on 465 skips the STARTTLS round trips
+    server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_SSL_PORT)
+    server.login(sender_email, sender_password)
+    _smtp_conn = server
+    
+    return _smtp_conn
+
+def close_smtp_connection():
+    """Close the shared SMTP connection if one is open"""
+    
+    global _smtp_conn
+    
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        _smtp_conn = None
+
+atexit.register(close_smtp_connection)
+
+def get_email_config():
+    """Return (sender, password, recipient) from the environment, or None if incomplete"""
+    
+    sender_email = os.getenv('SENDER_EMAIL')
+    sender_password = os.getenv('SENDER_PASSWORD')
+    recipient_email = os.getenv('RECIPIENT_EMAIL')
+    
+    if not all([sender_email, sender_password, recipient_email]):
+        return None
+    
+    return sender_email, sender_password, recipient_email
+
+def send_enhanced_dashboard_email(jobs_df, analytics):
+    """Send beautiful HTML email with dashboard charts"""
+    
+    logger.info("\n📧 Creating Enhanced Dashboard Email...")
+    
+    try:
+        # Email configuration
+        email_config = get_email_config()
+        
+        if email_config is None:
+            logger.error("❌ Email configuration incomplete")
+            return False
+        
+        sender_email, sender_password, recipient_email = email_config
+        
+        # Create charts (nothing to plot on a day without jobs)
+        chart_files = create_dashboard_charts(analytics) if not jobs_df.empty else []
+        
+        # Create email
+        msg = MIMEMultipart('related')
+        msg['From'] = sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = f"📊 Data Jobs Intelligence Dashboard - {datetime.now().strftime('%Y-%m-%d')}"
+        
+        # Create HTML email body
+        html_parts = [_HTML_HEAD, f"""
             <div class="container">
                 <div class="header">
                     <h1><span class="emoji">📊</span> Data Jobs Intelligence Dashboard</h1>
@@ -266,53 +374,62 @@ def send_enhanced_dashboard_email(jobs_data, analytics):
                         </div>
                     </div>
                 </div>
-        """
+        """]
         
         # Add charts to email
-        for chart_name, chart_path in chart_files:
+        for chart_name, chart_cid, chart_path in chart_files:
             if os.path.exists(chart_path):
-                html_body += f"""
+                html_parts.append(f"""
                 <div class="chart-container">
                     <h3>{chart_name}</h3>
-                    <img src="cid:{chart_name.lower().replace(' ', '_')}" class="chart-image" alt="{chart_name}">
+                    <img src="cid:{chart_cid}" class="chart-image" alt="{chart_name}">
                 </div>
-                """
+                """)
         
         # Add insights section
-        html_body += f"""
+        html_parts.append(f"""
                 <div class="section">
                     <h2><span class="emoji">🔍</span> Key Insights</h2>
-        """
+        """)
+        
+        # Look each mapping up once for the insights and breakdown
+        total_jobs = analytics.get('total_jobs') or 1
+        by_category = analytics.get('jobs_by_category') or {}
+        by_work_mode = analytics.get('jobs_by_work_mode') or {}
+        by_experience = analytics.get('jobs_by_experience') or {}
+        
+        # Percentages computed once per mapping
+        category_pct = {category: count * 100 / total_jobs for category, count in by_category.items()}
+        work_mode_pct = {mode: count * 100 / total_jobs for mode, count in by_work_mode.items()}
         
         # Generate insights
-        if analytics.get('jobs_by_category'):
-            top_category = max(analytics['jobs_by_category'], key=analytics['jobs_by_category'].get)
-            html_body += f"""
+        if by_category:
+            top_category, top_count = max(by_category.items(), key=itemgetter(1))
+            html_parts.append(f"""
                     <div class="insight">
-                        <strong>Most In-Demand:</strong> {top_category.replace('_', ' ').title()} positions lead the market with {analytics['jobs_by_category'][top_category]} openings.
+                        <strong>Most In-Demand:</strong> {top_category.replace('_', ' ').title()} positions lead the market with {top_count} openings.
                     </div>
-            """
+            """)
         
-        if analytics.get('jobs_by_work_mode'):
-            remote_count = analytics['jobs_by_work_mode'].get('Remote', 0)
-            total_jobs = analytics.get('total_jobs', 1)
-            remote_pct = (remote_count / total_jobs) * 100
-            html_body += f"""
+        if by_work_mode:
+            remote_count = by_work_mode.get('Remote', 0)
+            remote_pct = work_mode_pct.get('Remote', 0)
+            html_parts.append(f"""
                     <div class="insight">
                         <strong>Remote Work Trend:</strong> {remote_pct:.1f}% of positions offer remote work options ({remote_count} out of {total_jobs} jobs).
                     </div>
-            """
+            """)
         
-        if analytics.get('jobs_by_experience'):
-            senior_count = analytics['jobs_by_experience'].get('Senior Level', 0)
-            html_body += f"""
+        if by_experience:
+            senior_count = by_experience.get('Senior Level', 0)
+            html_parts.append(f"""
                     <div class="insight">
                         <strong>Experience Demand:</strong> {senior_count} senior-level positions available, indicating strong demand for experienced professionals.
                     </div>
-            """
+            """)
         
         # Add detailed breakdown
-        html_body += f"""
+        html_parts.append(f"""
                 </div>
                 
                 <div class="section">
@@ -320,110 +437,134 @@ def send_enhanced_dashboard_email(jobs_data, analytics):
                     
                     <h3>Jobs by Category:</h3>
                     <ul style="list-style-type: none; padding: 0;">
-        """
+        """)
         
-        for category, count in analytics.get('jobs_by_category', {}).items():
-            percentage = (count / analytics.get('total_jobs', 1)) * 100
-            html_body += f"""
+        for category, count in by_category.items():
+            percentage = category_pct[category]
+            html_parts.append(f"""
                         <li style="padding: 8px; margin: 5px 0; background-color: white; border-radius: 5px; border-left: 4px solid #007bff;">
                             <strong>{category.replace('_', ' ').title()}:</strong> {count} positions ({percentage:.1f}%)
                         </li>
-            """
+            """)
         
-        html_body += """
+        html_parts.append("""
                     </ul>
                     
                     <h3>Work Mode Distribution:</h3>
                     <ul style="list-style-type: none; padding: 0;">
-        """
+        """)
         
-        for mode, count in analytics.get('jobs_by_work_mode', {}).items():
-            percentage = (count / analytics.get('total_jobs', 1)) * 100
-            color = {'Remote': '#28a745', 'Hybrid': '#ffc107', 'On-site': '#dc3545'}.get(mode, '#007bff')
-            html_body += f"""
+        for mode, count in by_work_mode.items():
+            percentage = work_mode_pct[mode]
+            color = WORK_MODE_COLORS.get(mode, '#007bff')
+            html_parts.append(f"""
                         <li style="padding: 8px; margin: 5px 0; background-color: white; border-radius: 5px; border-left: 4px solid {color};">
                             <strong>{mode}:</strong> {count} positions ({percentage:.1f}%)
                         </li>
-            """
+            """)
         
         # Add footer
-        html_body += f"""
-                    </ul>
-                </div>
-                
-                <div class="footer">
-                    <p><strong>Data Jobs Intelligence Pipeline</strong></p>
-                    <p>Automated Job Market Analysis | Built with ❤️ by Eman Elgamal</p>
-                    <p>Next Report: Tomorrow at 9:00 AM</p>
-                    <p style="font-size: 12px; color: #999;">
-                        Data Source: Glassdoor, Indeed | Processing Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_parts.append(_HTML_FOOT_TEMPLATE.format(now=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
         
         # Attach HTML body
+        html_body = ''.join(html_parts)
         msg.attach(MIMEText(html_body, 'html'))
         
         # Attach chart images
-        for chart_name, chart_path in chart_files:
+        for chart_name, chart_cid, chart_path in chart_files:
             if os.path.exists(chart_path):
                 with open(chart_path, 'rb') as f:
-                    img_data = f.read()
-                    image = MIMEBase('image', 'png')
-                    image.set_payload(img_data)
-                    encoders.encode_base64(image)
-                    image.add_header('Content-ID', f'<{chart_name.lower().replace(" ", "_")}>')
-                    image.add_header('Content-Disposition', f'inline; filename="{chart_name}.png"')
-                    msg.attach(image)
+                    image = MIMEImage(f.read(), _subtype='png')
+                image.add_header('Content-ID', f'<{chart_cid}>')
+                image.add_header('Content-Disposition', 'inline', filename=f'{chart_name}.png')
+                msg.attach(image)
         
         # Send email
-        print("📤 Sending enhanced dashboard email...")
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, recipient_email, msg.as_string())
-        server.quit()
+        logger.info("📤 Sending enhanced dashboard email...")
+        server = get_smtp_connection(sender_email, sender_password)
+        server.send_message(msg, from_addr=sender_email, to_addrs=[recipient_email])
         
-        print(f"✅ Enhanced dashboard email sent successfully to {recipient_email}")
-        print("📊 Email includes embedded charts and interactive analytics!")
+        logger.info("✅ Enhanced dashboard email sent successfully to %s", recipient_email)
+        logger.info("📊 Email includes embedded charts and interactive analytics!")
         
         return True
         
     except Exception as e:
-        print(f"❌ Enhanced email sending failed: {e}")
+        logger.error("❌ Enhanced email sending failed: %s", e)
         return False
 
+def read_job_csv(csv_file):
+    """Read only the columns the report uses, from the Parquet twin or Arrow-backed CSV when pyarrow is installed"""
+    
+    import pandas as pd
+    
+    df = None
+    
+    # The production pipeline writes a typed Parquet copy next to each CSV
+    parquet_file = os.path.splitext(csv_file)[0] + '.parquet'
+    if os.path.exists(parquet_file):
+        try:
+            df = pd.read_parquet(parquet_file, columns=REPORT_COLUMNS)
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning("⚠️  Could not read %s, falling back to the CSV: %s", parquet_file, e)
+    
+    if df is None:
+        try:
+            df = pd.read_csv(csv_file, engine='pyarrow', usecols=REPORT_COLUMNS, dtype_backend='pyarrow')
+        except ImportError:
+            df = pd.read_csv(csv_file, usecols=REPORT_COLUMNS)
+    
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    
+    return df
+
 def load_latest_job_data():
-    """Load the most recent job data"""
+    """Load the most recent job data, or None when there is none"""
     
-    csv_files = glob.glob("data/production_jobs_*.csv") + glob.glob("data/enhanced_jobs_*.csv")
+    latest_file, latest_ctime = None, None
     
-    if csv_files:
-        latest_file = max(csv_files, key=os.path.getctime)
-        df = pd.read_csv(latest_file)
-        return df.to_dict('records')
+    try:
+        # One directory pass; DirEntry.stat() reuses the scan's metadata where it can
+        with os.scandir('data') as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(JOB_FILE_PREFIXES) and name.endswith('.csv') and entry.is_file():
+                    ctime = entry.stat().st_ctime
+                    if latest_ctime is None or ctime > latest_ctime:
+                        latest_file, latest_ctime = entry.path, ctime
+    except FileNotFoundError:
+        pass
     
-    return []
+    if latest_file:
+        return read_job_csv(latest_file)
+    
+    return None
 
-def generate_analytics_from_data(jobs_data):
+def generate_analytics_from_data(df):
     """Generate analytics from job data"""
     
-    if not jobs_data:
+    if df.empty:
         return {}
     
-    df = pd.DataFrame(jobs_data)
+    counts = count_columns(df, CATEGORY_COLUMNS)
+    
+    # One 'N/A' comparison serves every company figure in the report; the Arrow reader
+    # turns 'N/A' into a missing value, so both count as unknown
+    company = df['company']
+    company_mask = (company.notna() & company.ne('N/A')).fillna(False).to_numpy(bool)
+    known_companies = df.loc[company_mask, 'company']
     
     analytics = {
         'total_jobs': len(df),
-        'jobs_by_category': df['category'].value_counts().to_dict(),
-        'jobs_by_work_mode': df['work_mode'].value_counts().to_dict(),
-        'jobs_by_experience': df['experience_level'].value_counts().to_dict(),
-        'jobs_by_type': df['job_type'].value_counts().to_dict(),
-        'top_companies': df[df['company'] != 'N/A']['company'].value_counts().head(10).to_dict(),
-        'sources': df['source'].value_counts().to_dict()
+        'jobs_by_category': counts['category'].to_dict(),
+        'jobs_by_work_mode': counts['work_mode'].to_dict(),
+        'jobs_by_experience': counts['experience_level'].to_dict(),
+        'jobs_by_type': counts['job_type'].to_dict(),
+        'top_companies': known_companies.value_counts().head(10).to_dict(),
+        'sources': counts['source'].to_dict()
     }
     
     return analytics
@@ -431,39 +572,45 @@ def generate_analytics_from_data(jobs_data):
 def run_dashboard_email_pipeline():
     """Run the complete pipeline with enhanced dashboard email"""
     
-    print("🚀 ENHANCED DASHBOARD EMAIL PIPELINE")
-    print("="*60)
+    logger.info("🚀 ENHANCED DASHBOARD EMAIL PIPELINE")
+    logger.info("=" * 60)
     
     try:
+        # Fail fast on missing credentials before any data or chart work
+        if get_email_config() is None:
+            logger.error("❌ Email configuration incomplete")
+            return False
+        
         # Load latest job data
-        print("📂 Loading latest job data...")
-        jobs_data = load_latest_job_data()
+        logger.info("📂 Loading latest job data...")
+        jobs_df = load_latest_job_data()
         
-        if not jobs_data:
-            print("❌ No job data found!")
+        if jobs_df is None or jobs_df.empty:
+            logger.error("❌ No job data found!")
             return False
         
-        print(f"✅ Loaded {len(jobs_data)} jobs")
+        logger.info("✅ Loaded %d jobs", len(jobs_df))
         
         # Generate analytics
-        print("📊 Generating analytics...")
-        analytics = generate_analytics_from_data(jobs_data)
+        logger.info("📊 Generating analytics...")
+        analytics = generate_analytics_from_data(jobs_df)
         
         # Send enhanced email with dashboard
-        success = send_enhanced_dashboard_email(jobs_data, analytics)
+        success = send_enhanced_dashboard_email(jobs_df, analytics)
         
         if success:
-            print("\n🎉 ENHANCED DASHBOARD EMAIL SENT SUCCESSFULLY!")
-            print("📧 Check your email for the beautiful dashboard report!")
-            print("📊 Includes embedded charts and detailed analytics")
+            logger.info("\n🎉 ENHANCED DASHBOARD EMAIL SENT SUCCESSFULLY!")
+            logger.info("📧 Check your email for the beautiful dashboard report!")
+            logger.info("📊 Includes embedded charts and detailed analytics")
         else:
-            print("\n❌ Enhanced email sending failed")
+            logger.error("\n❌ Enhanced email sending failed")
         
         return success
         
     except Exception as e:
-        print(f"❌ Pipeline failed: {e}")
+        logger.error("❌ Pipeline failed: %s", e)
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     run_dashboard_email_pipeline()
\ No newline at end of file
@@ -3,15 +3,20 @@ Production Ready Data Jobs Pipeline with Snowflake Integration
 Author: Eman Elgamal
 """
 
-import time
+import re
+import asyncio
+import numpy as np
 import pandas as pd
 import os
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from dotenv import load_dotenv
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -19,9 +24,34 @@ from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 
+# Async HTTP scraping is optional; without httpx or selectolax every page goes through Selenium
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# selectolax 1.0 dropped selectolax.parser; the Lexbor backend exists on both sides of it
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Polars speeds up analytics on large batches; pandas is used without it
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 # Load environment variables
 load_dotenv()
 
+# Seconds to wait on the SMTP server before giving up on the report
+SMTP_TIMEOUT = 30
+
+# One Snowflake session is kept for the life of the process
+_snowflake_conn = None
+_table_ready = False
+
 # Job categories with alternative sources
 JOB_SOURCES = {
     'glassdoor': {
@@ -36,6 +66,54 @@ JOB_SOURCES = {
     }
 }
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Asset requests the headless browser drops; the scrapers only read DOM text
+BLOCKED_ASSET_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.css', '*.woff', '*.woff2', '*.ttf', '*.mp4']
+
+# Scraping stops once this many jobs are collected
+TARGET_JOB_COUNT = 50
+
+# Selectors are tried in order; the first one that matches wins
+GLASSDOOR_JOB_SELECTORS = [
+    "[data-test='job-title']",
+    ".JobCard_jobTitle___7I6y",
+    "a[data-test='job-link']"
+]
+
+GLASSDOOR_LOCATION_SELECTORS = [
+    "[data-test='job-location']",
+    ".JobCard_location__rCz3x"
+]
+
+GLASSDOOR_COMPANY_SELECTORS = [
+    "[data-test='employer-name']",
+    ".EmployerProfile_compactEmployerName__LE242"
+]
+
+GLASSDOOR_COOKIE_SELECTOR = "[data-test='gdpr-accept']"
+
+INDEED_JOB_SELECTORS = [
+    "h2.jobTitle a span[title]",
+    "[data-jk] h2 a span",
+    ".jobTitle a span"
+]
+
+# Runs in the page: for each selector list, return the texts of the first selector that matches
+EXTRACT_TEXTS_SCRIPT = """
+const selectorLists = arguments[0], limit = arguments[1], preferTitle = arguments[2];
+const pick = (selectors) => {
+    for (const selector of selectors) {
+        const nodes = document.querySelectorAll(selector);
+        if (nodes.length) return Array.from(nodes);
+    }
+    return [];
+};
+return selectorLists.map((selectors) => pick(selectors).slice(0, limit).map(
+    (node) => ((preferTitle && node.getAttribute('title')) || node.innerText || '').trim()
+));
+"""
+
 def setup_chrome_driver():
     """Setup Chrome driver with optimized options"""
     
@@ -45,49 +123,219 @@ def setup_chrome_driver():
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
     
     driver = webdriver.Chrome(options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
+    # Only the job card text is read, so skip downloading assets
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_ASSET_URLS})
+    
     return driver
 
-def determine_job_type(title):
-    """Determine job type from title"""
-    title_lower = title.lower()
-    if any(word in title_lower for word in ['intern', 'internship', 'trainee']):
-        return "Internship"
-    elif any(word in title_lower for word in ['contract', 'contractor', 'freelance']):
-        return "Contract"
-    elif any(word in title_lower for word in ['part-time', 'part time']):
-        return "Part-time"
-    else:
-        return "Full-time"
-
-def determine_work_mode(title, location):
-    """Determine work mode from title and location"""
-    combined = f"{title} {location}".lower()
-    if any(word in combined for word in ['remote', 'work from home', 'wfh']):
-        return "Remote"
-    elif any(word in combined for word in ['hybrid']):
-        return "Hybrid"
-    else:
-        return "On-site"
-
-def determine_experience_level(title):
-    """Determine experience level from title"""
-    title_lower = title.lower()
-    if any(word in title_lower for word in ['junior', 'entry', 'associate', 'jr']):
-        return "Entry Level"
-    elif any(word in title_lower for word in ['senior', 'sr', 'lead', 'principal']):
-        return "Senior Level"
-    elif any(word in title_lower for word in ['manager', 'director', 'head']):
-        return "Management"
-    else:
-        return "Mid Level"
+# Classification keywords, matched against whole words of the title (and location for work mode)
+INTERNSHIP_WORDS = frozenset({'intern', 'internship', 'trainee'})
+CONTRACT_WORDS = frozenset({'contract', 'contractor', 'freelance'})
+PART_TIME_PHRASES = ('part time',)
+REMOTE_WORDS = frozenset({'remote', 'wfh'})
+REMOTE_PHRASES = ('work from home',)
+HYBRID_WORDS = frozenset({'hybrid'})
+ENTRY_LEVEL_WORDS = frozenset({'junior', 'entry', 'associate', 'jr'})
+SENIOR_LEVEL_WORDS = frozenset({'senior', 'sr', 'lead', 'principal'})
+MANAGEMENT_WORDS = frozenset({'manager', 'director', 'head'})
+
+# Low-cardinality columns, held as pandas categoricals and staged to Snowflake dictionary-encoded
+CATEGORY_COLUMNS = ['category', 'job_type', 'work_mode', 'experience_level', 'source']
+SNOWFLAKE_CATEGORY_COLUMNS = [column.upper() for column in CATEGORY_COLUMNS]
+
+# Analytics key -> column it counts
+ANALYTICS_COUNT_COLUMNS = {
+    'jobs_by_category': 'category',
+    'jobs_by_type': 'job_type',
+    'jobs_by_work_mode': 'work_mode',
+    'jobs_by_experience': 'experience_level',
+    'sources': 'source'
+}
+
+# Columns that identify the same posting across categories and reruns
+JOB_IDENTITY_COLUMNS = ['job_title', 'company', 'location', 'source']
+
+# Column order shared by scraped and sample jobs
+JOB_COLUMNS = [
+    'job_id', 'job_title', 'company', 'location', 'category', 'job_type',
+    'work_mode', 'experience_level', 'source', 'scraped_timestamp', 'posted_date'
+]
+
+def keyword_pattern(words, phrases=()):
+    """Compile a whole-word regex for a keyword set and any multi-word phrases"""
+    terms = [re.escape(word) for word in sorted(words)]
+    terms += [r"[^a-z']+".join(map(re.escape, phrase.split())) for phrase in phrases]
+    return re.compile(rf"(?<![a-z'])(?:{'|'.join(terms)})(?![a-z'])")
+
+INTERNSHIP_PATTERN = keyword_pattern(INTERNSHIP_WORDS)
+CONTRACT_PATTERN = keyword_pattern(CONTRACT_WORDS)
+PART_TIME_PATTERN = keyword_pattern((), PART_TIME_PHRASES)
+REMOTE_PATTERN = keyword_pattern(REMOTE_WORDS, REMOTE_PHRASES)
+HYBRID_PATTERN = keyword_pattern(HYBRID_WORDS)
+ENTRY_LEVEL_PATTERN = keyword_pattern(ENTRY_LEVEL_WORDS)
+SENIOR_LEVEL_PATTERN = keyword_pattern(SENIOR_LEVEL_WORDS)
+MANAGEMENT_PATTERN = keyword_pattern(MANAGEMENT_WORDS)
+
+def classify_jobs(df):
+    """Fill job_type, work_mode and experience_level for every row at once"""
+    title = df['job_title'].str.lower()
+    combined = title + ' ' + df['location'].str.lower()
+    
+    df['job_type'] = np.select(
+        [title.str.contains(INTERNSHIP_PATTERN), title.str.contains(CONTRACT_PATTERN), title.str.contains(PART_TIME_PATTERN)],
+        ['Internship', 'Contract', 'Part-time'],
+        default='Full-time'
+    )
+    df['work_mode'] = np.select(
+        [combined.str.contains(REMOTE_PATTERN), combined.str.contains(HYBRID_PATTERN)],
+        ['Remote', 'Hybrid'],
+        default='On-site'
+    )
+    df['experience_level'] = np.select(
+        [title.str.contains(ENTRY_LEVEL_PATTERN), title.str.contains(SENIOR_LEVEL_PATTERN), title.str.contains(MANAGEMENT_PATTERN)],
+        ['Entry Level', 'Senior Level', 'Management'],
+        default='Mid Level'
+    )
+    
+    return df
+
+def dedupe_jobs(df):
+    """Drop repeated postings and give each one a stable, content-derived job_id"""
+    df = df.drop_duplicates(subset=JOB_IDENTITY_COLUMNS, keep='first').reset_index(drop=True)
+    df['job_id'] = pd.util.hash_pandas_object(df[JOB_IDENTITY_COLUMNS], index=False).astype(str)
+    return df
+
+def batch_stamp():
+    """Capture one (now, id timestamp, date) triple shared by a batch of jobs"""
+    now = datetime.now()
+    return now, now.strftime('%Y%m%d_%H%M%S'), now.date()
+
+def make_job(source, category, index, title, company, location, stamp):
+    """Build one scraped job record; classification happens later in classify_jobs"""
+    
+    now, ts, today = stamp
+    
+    return {
+        'job_id': f"{source}_{category}_{index}_{ts}",
+        'job_title': title,
+        'company': company,
+        'location': location,
+        'category': category,
+        'source': source,
+        'scraped_timestamp': now,
+        'posted_date': today
+    }
+
+async def fetch_page(client, url):
+    """Fetch one listing page, returning its HTML or None on failure"""
+    
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.text
+    except httpx.HTTPError as e:
+        print(f"⚠️  Fetch failed for {url}: {e}")
+        return None
+
+def first_matching_nodes(tree, selectors):
+    """Return the nodes for the first selector that matches anything"""
+    
+    for selector in selectors:
+        nodes = tree.css(selector)
+        if nodes:
+            return nodes
+    return []
+
+def parse_glassdoor_html(html, category):
+    """Parse Glassdoor jobs from static page HTML"""
+    
+    tree = HTMLParser(html)
+    stamp = batch_stamp()
+    titles = [node.text(strip=True) for node in first_matching_nodes(tree, GLASSDOOR_JOB_SELECTORS)]
+    locations = [node.text(strip=True) for node in first_matching_nodes(tree, GLASSDOOR_LOCATION_SELECTORS)]
+    companies = [node.text(strip=True) for node in first_matching_nodes(tree, GLASSDOOR_COMPANY_SELECTORS)]
+    
+    jobs = []
+    for i, title in enumerate(titles[:20]):  # Max 20 per category
+        location = locations[i] if i < len(locations) else "N/A"
+        company = companies[i] if i < len(companies) else "N/A"
+        if title and len(title) > 3:
+            jobs.append(make_job('glassdoor', category, i, title, company, location, stamp))
+    
+    return jobs
+
+def parse_indeed_html(html, category):
+    """Parse Indeed jobs from static page HTML"""
+    
+    tree = HTMLParser(html)
+    stamp = batch_stamp()
+    
+    jobs = []
+    for i, node in enumerate(first_matching_nodes(tree, INDEED_JOB_SELECTORS)[:15]):  # Max 15 per category
+        title = node.attributes.get('title') or node.text(strip=True)
+        if title and len(title) > 3:
+            jobs.append(make_job('indeed', category, i, title, 'Various Companies', 'United States', stamp))
+    
+    return jobs
+
+PAGE_PARSERS = {
+    'glassdoor': parse_glassdoor_html,
+    'indeed': parse_indeed_html
+}
+
+async def scrape_pages(targets):
+    """Fetch and parse listing pages concurrently, cancelling the rest once enough jobs are in"""
+    
+    jobs, empty_targets = [], []
+    
+    async with httpx.AsyncClient(headers={'User-Agent': USER_AGENT}, follow_redirects=True, timeout=20) as client:
+        async def scrape_target(target):
+            source, category, url = target
+            html = await fetch_page(client, url)
+            return target, PAGE_PARSERS[source](html, category) if html else []
+        
+        tasks = [asyncio.create_task(scrape_target(target)) for target in targets]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                (source, category, url), page_jobs = await next_done
+                if page_jobs:
+                    jobs.extend(page_jobs)
+                    print(f"✅ Found {len(page_jobs)} jobs for {source} {category}")
+                else:
+                    empty_targets.append((source, category, url))
+                
+                if len(jobs) >= TARGET_JOB_COUNT:
+                    print(f"🎯 Reached target of {TARGET_JOB_COUNT}+ jobs!")
+                    break
+        finally:
+            # Let cancelled fetches unwind before the client closes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    return jobs, empty_targets
+
+def wait_for_job_cards(driver, selectors, timeout=12):
+    """Wait until any job card selector is present, returning False on timeout"""
+    
+    # A selector list matches if any member does, so each poll is one find_element call
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ', '.join(selectors)))
+        )
+        return True
+    except TimeoutException:
+        return False
 
 def scrape_jobs_smart():
     """Smart job scraping with multiple sources and fallbacks"""
@@ -98,20 +346,31 @@ def scrape_jobs_smart():
     all_jobs = []
     driver = None
     
+    targets = [
+        (source, category, url)
+        for source, categories in JOB_SOURCES.items()
+        for category, url in categories.items()
+    ]
+    
     try:
-        driver = setup_chrome_driver()
-        print("✅ Chrome driver ready")
+        # Fetch every listing page at once; pages that need JavaScript come back empty
+        browser_targets = targets
+        if httpx is not None and HTMLParser is not None:
+            print(f"🌐 Fetching {len(targets)} listing pages concurrently...")
+            all_jobs, browser_targets = asyncio.run(scrape_pages(targets))
+        else:
+            print("⚠️  httpx or selectolax not installed, scraping every page in the browser")
         
-        # Try different job sites
-        for source, categories in JOB_SOURCES.items():
-            print(f"\n🌐 Trying source: {source.upper()}")
+        # Selenium fallback, only for the pages the HTTP pass could not parse
+        if browser_targets and len(all_jobs) < TARGET_JOB_COUNT:
+            driver = setup_chrome_driver()
+            print("✅ Chrome driver ready")
             
-            for category, url in categories.items():
-                print(f"🔍 Scraping: {category}")
+            for source, category, url in browser_targets:
+                print(f"🔍 Scraping in browser: {source} {category}")
                 
                 try:
                     driver.get(url)
-                    time.sleep(8)  # Wait for page load
                     
                     # Handle different sites
                     if source == 'glassdoor':
@@ -123,115 +382,74 @@ def scrape_jobs_smart():
                     print(f"✅ Found {len(jobs)} jobs for {category}")
                     
                     # Stop if we have enough jobs
-                    if len(all_jobs) >= 50:
-                        print(f"🎯 Reached target of 50+ jobs!")
+                    if len(all_jobs) >= TARGET_JOB_COUNT:
+                        print(f"🎯 Reached target of {TARGET_JOB_COUNT}+ jobs!")
                         break
-                        
-                    time.sleep(5)  # Rate limiting
                     
                 except Exception as e:
                     print(f"⚠️  Error with {category}: {e}")
                     continue
-            
-            if len(all_jobs) >= 50:
-                break
+        
+        jobs_df = classify_jobs(pd.DataFrame(all_jobs, columns=JOB_COLUMNS))
         
         # Add sample data if real scraping fails
-        if len(all_jobs) < 5:
+        if len(jobs_df) < 5:
             print("📊 Adding sample data for demonstration...")
-            sample_jobs = generate_sample_jobs()
-            all_jobs.extend(sample_jobs)
+            sample_df = pd.DataFrame(generate_sample_jobs(), columns=JOB_COLUMNS)
+            jobs_df = pd.concat([jobs_df, sample_df], ignore_index=True) if len(jobs_df) else sample_df
         
-        print(f"\n🎉 Total jobs collected: {len(all_jobs)}")
+        print(f"\n🎉 Total jobs collected: {len(jobs_df)}")
         
     except Exception as e:
         print(f"❌ Scraping error: {e}")
         print("📊 Using sample data...")
-        all_jobs = generate_sample_jobs()
+        jobs_df = pd.DataFrame(generate_sample_jobs(), columns=JOB_COLUMNS)
         
     finally:
         if driver:
             driver.quit()
     
-    return all_jobs
+    return jobs_df
 
 def scrape_glassdoor(driver, category):
     """Scrape jobs from Glassdoor"""
     
     jobs = []
+    stamp = batch_stamp()
+    
+    if not wait_for_job_cards(driver, GLASSDOOR_JOB_SELECTORS):
+        print(f"⚠️  No Glassdoor job cards loaded for {category}")
+        return jobs
     
     try:
-        # Handle cookie popup
-        try:
-            cookie_btn = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-test='gdpr-accept']"))
-            )
-            cookie_btn.click()
-            time.sleep(2)
-        except:
-            pass
-        
-        # Multiple selectors for job elements
-        job_selectors = [
-            "[data-test='job-title']",
-            ".JobCard_jobTitle___7I6y",
-            "a[data-test='job-link']"
-        ]
-        
-        location_selectors = [
-            "[data-test='job-location']",
-            ".JobCard_location__rCz3x"
-        ]
-        
-        company_selectors = [
-            "[data-test='employer-name']",
-            ".EmployerProfile_compactEmployerName__LE242"
-        ]
-        
-        # Find job elements
-        job_elements = []
-        for selector in job_selectors:
-            job_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if job_elements:
-                break
-        
-        location_elements = []
-        for selector in location_selectors:
-            location_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if location_elements:
-                break
-        
-        company_elements = []
-        for selector in company_selectors:
-            company_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if company_elements:
-                break
+        # Handle cookie popup; once accepted, the session cookie keeps it away on later categories
+        if driver.execute_script("return document.querySelector(arguments[0]) !== null", GLASSDOOR_COOKIE_SELECTOR):
+            try:
+                cookie_btn = WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, GLASSDOOR_COOKIE_SELECTOR))
+                )
+                cookie_btn.click()
+                WebDriverWait(driver, 2).until(
+                    EC.invisibility_of_element_located((By.CSS_SELECTOR, GLASSDOOR_COOKIE_SELECTOR))
+                )
+            except:
+                pass
+        
+        # Pull every title, location and company text in one round-trip
+        titles, locations, companies = driver.execute_script(
+            EXTRACT_TEXTS_SCRIPT,
+            [GLASSDOOR_JOB_SELECTORS, GLASSDOOR_LOCATION_SELECTORS, GLASSDOOR_COMPANY_SELECTORS],
+            20,  # Max 20 per category
+            False
+        )
         
         # Extract job data
-        for i in range(min(len(job_elements), 20)):  # Max 20 per category
-            try:
-                title = job_elements[i].text.strip() if i < len(job_elements) else "N/A"
-                location = location_elements[i].text.strip() if i < len(location_elements) else "N/A"
-                company = company_elements[i].text.strip() if i < len(company_elements) else "N/A"
-                
-                if title and title != "N/A" and len(title) > 3:
-                    job_data = {
-                        'job_id': f"glassdoor_{category}_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                        'job_title': title,
-                        'company': company,
-                        'location': location,
-                        'category': category,
-                        'job_type': determine_job_type(title),
-                        'work_mode': determine_work_mode(title, location),
-                        'experience_level': determine_experience_level(title),
-                        'source': 'glassdoor',
-                        'scraped_timestamp': datetime.now(),
-                        'posted_date': datetime.now().date()
-                    }
-                    jobs.append(job_data)
-                    
-            except Exception as e:
-                continue
+        for i, title in enumerate(titles):
+            location = locations[i] if i < len(locations) else "N/A"
+            company = companies[i] if i < len(companies) else "N/A"
+            
+            if title and len(title) > 3:
+                jobs.append(make_job('glassdoor', category, i, title, company, location, stamp))
                 
     except Exception as e:
         print(f"Glassdoor scraping error: {e}")
@@ -242,45 +460,20 @@ def scrape_indeed(driver, category):
     """Scrape jobs from Indeed"""
     
     jobs = []
+    stamp = batch_stamp()
+    
+    if not wait_for_job_cards(driver, INDEED_JOB_SELECTORS):
+        print(f"⚠️  No Indeed job cards loaded for {category}")
+        return jobs
     
     try:
-        # Indeed job selectors
-        job_selectors = [
-            "h2.jobTitle a span[title]",
-            "[data-jk] h2 a span",
-            ".jobTitle a span"
-        ]
-        
-        # Find job elements
-        job_elements = []
-        for selector in job_selectors:
-            job_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if job_elements:
-                break
+        # Pull every title in one round-trip, preferring the title attribute
+        titles, = driver.execute_script(EXTRACT_TEXTS_SCRIPT, [INDEED_JOB_SELECTORS], 15, True)  # Max 15 per category
         
         # Extract job data
-        for i, element in enumerate(job_elements[:15]):  # Max 15 per category
-            try:
-                title = element.get_attribute('title') or element.text.strip()
-                
-                if title and len(title) > 3:
-                    job_data = {
-                        'job_id': f"indeed_{category}_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                        'job_title': title,
-                        'company': 'Various Companies',
-                        'location': 'United States',
-                        'category': category,
-                        'job_type': determine_job_type(title),
-                        'work_mode': determine_work_mode(title, ''),
-                        'experience_level': determine_experience_level(title),
-                        'source': 'indeed',
-                        'scraped_timestamp': datetime.now(),
-                        'posted_date': datetime.now().date()
-                    }
-                    jobs.append(job_data)
-                    
-            except Exception as e:
-                continue
+        for i, title in enumerate(titles):
+            if title and len(title) > 3:
+                jobs.append(make_job('indeed', category, i, title, 'Various Companies', 'United States', stamp))
                 
     except Exception as e:
         print(f"Indeed scraping error: {e}")
@@ -290,9 +483,11 @@ def scrape_indeed(driver, category):
 def generate_sample_jobs():
     """Generate sample job data for testing"""
     
+    now, ts, today = batch_stamp()
+    
     sample_jobs = [
         {
-            'job_id': f"sample_001_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'job_id': f"sample_001_{ts}",
             'job_title': 'Senior Data Engineer',
             'company': 'Tech Innovations Inc',
             'location': 'New York, NY',
@@ -301,11 +496,11 @@ def generate_sample_jobs():
             'work_mode': 'Remote',
             'experience_level': 'Senior Level',
             'source': 'sample',
-            'scraped_timestamp': datetime.now(),
-            'posted_date': datetime.now().date()
+            'scraped_timestamp': now,
+            'posted_date': today
         },
         {
-            'job_id': f"sample_002_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'job_id': f"sample_002_{ts}",
             'job_title': 'Data Scientist - Machine Learning',
             'company': 'AI Solutions Corp',
             'location': 'San Francisco, CA',
@@ -314,11 +509,11 @@ def generate_sample_jobs():
             'work_mode': 'Hybrid',
             'experience_level': 'Mid Level',
             'source': 'sample',
-            'scraped_timestamp': datetime.now(),
-            'posted_date': datetime.now().date()
+            'scraped_timestamp': now,
+            'posted_date': today
         },
         {
-            'job_id': f"sample_003_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'job_id': f"sample_003_{ts}",
             'job_title': 'Business Intelligence Analyst',
             'company': 'DataFlow Analytics',
             'location': 'Chicago, IL',
@@ -327,11 +522,11 @@ def generate_sample_jobs():
             'work_mode': 'On-site',
             'experience_level': 'Entry Level',
             'source': 'sample',
-            'scraped_timestamp': datetime.now(),
-            'posted_date': datetime.now().date()
+            'scraped_timestamp': now,
+            'posted_date': today
         },
         {
-            'job_id': f"sample_004_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'job_id': f"sample_004_{ts}",
             'job_title': 'Data Warehouse Engineer',
             'company': 'Enterprise Data Systems',
             'location': 'Austin, TX',
@@ -340,11 +535,11 @@ def generate_sample_jobs():
             'work_mode': 'Remote',
             'experience_level': 'Senior Level',
             'source': 'sample',
-            'scraped_timestamp': datetime.now(),
-            'posted_date': datetime.now().date()
+            'scraped_timestamp': now,
+            'posted_date': today
         },
         {
-            'job_id': f"sample_005_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'job_id': f"sample_005_{ts}",
             'job_title': 'Junior Data Analyst',
             'company': 'StartUp Analytics',
             'location': 'Boston, MA',
@@ -353,57 +548,86 @@ def generate_sample_jobs():
             'work_mode': 'Hybrid',
             'experience_level': 'Entry Level',
             'source': 'sample',
-            'scraped_timestamp': datetime.now(),
-            'posted_date': datetime.now().date()
+            'scraped_timestamp': now,
+            'posted_date': today
         }
     ]
     
     return sample_jobs
 
+def get_snowflake_connection():
+    """Return the shared Snowflake connection, reconnecting if it was closed"""
+    
+    global _snowflake_conn
+    
+    if _snowflake_conn is not None and not _snowflake_conn.is_closed():
+        return _snowflake_conn
+    
+    import snowflake.connector
+    
+    _snowflake_conn = snowflake.connector.connect(
+        user=os.getenv('SNOWFLAKE_USER'),
+        password=os.getenv('SNOWFLAKE_PASSWORD'),
+        account=os.getenv('SNOWFLAKE_ACCOUNT'),
+        warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
+        database=os.getenv('SNOWFLAKE_DATABASE'),
+        schema=os.getenv('SNOWFLAKE_SCHEMA'),
+        role=os.getenv('SNOWFLAKE_ROLE')
+    )
+    print("✅ Connected to Snowflake")
+    
+    return _snowflake_conn
+
+def close_snowflake_connection():
+    """Close the shared Snowflake connection if one is open"""
+    
+    global _snowflake_conn
+    
+    if _snowflake_conn is not None:
+        try:
+            _snowflake_conn.close()
+        except Exception:
+            pass
+        _snowflake_conn = None
+
+atexit.register(close_snowflake_connection)
+
 def save_to_snowflake(jobs_data):
     """Save jobs data to Snowflake"""
     
+    global _table_ready
+    
     print("\n💾 Saving to Snowflake...")
     
     try:
-        import snowflake.connector
         from snowflake.connector.pandas_tools import write_pandas
         
-        # Create connection
-        conn = snowflake.connector.connect(
-            user=os.getenv('SNOWFLAKE_USER'),
-            password=os.getenv('SNOWFLAKE_PASSWORD'),
-            account=os.getenv('SNOWFLAKE_ACCOUNT'),
-            warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
-            database=os.getenv('SNOWFLAKE_DATABASE'),
-            schema=os.getenv('SNOWFLAKE_SCHEMA'),
-            role=os.getenv('SNOWFLAKE_ROLE')
-        )
-        
-        print("✅ Connected to Snowflake")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(jobs_data)
-        df.columns = df.columns.str.upper()  # Snowflake prefers uppercase
-        
-        # Create table if not exists
-        cur = conn.cursor()
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS DATA_JOBS (
-            JOB_ID VARCHAR(200) PRIMARY KEY,
-            JOB_TITLE VARCHAR(500),
-            COMPANY VARCHAR(300),
-            LOCATION VARCHAR(200),
-            CATEGORY VARCHAR(50),
-            JOB_TYPE VARCHAR(50),
-            WORK_MODE VARCHAR(50),
-            EXPERIENCE_LEVEL VARCHAR(50),
-            SOURCE VARCHAR(50),
-            SCRAPED_TIMESTAMP TIMESTAMP_NTZ,
-            POSTED_DATE DATE
-        )
-        """
-        cur.execute(create_table_sql)
+        conn = get_snowflake_connection()
+        
+        # Rename on a copy so the caller's lowercase columns stay intact
+        df = jobs_data.rename(columns=str.upper)  # Snowflake prefers uppercase
+        df[SNOWFLAKE_CATEGORY_COLUMNS] = df[SNOWFLAKE_CATEGORY_COLUMNS].astype('category')
+        
+        # Create table once per process
+        if not _table_ready:
+            create_table_sql = """
+            CREATE TABLE IF NOT EXISTS DATA_JOBS (
+                JOB_ID VARCHAR(200) PRIMARY KEY,
+                JOB_TITLE VARCHAR(500),
+                COMPANY VARCHAR(300),
+                LOCATION VARCHAR(200),
+                CATEGORY VARCHAR(50),
+                JOB_TYPE VARCHAR(50),
+                WORK_MODE VARCHAR(50),
+                EXPERIENCE_LEVEL VARCHAR(50),
+                SOURCE VARCHAR(50),
+                SCRAPED_TIMESTAMP TIMESTAMP_NTZ,
+                POSTED_DATE DATE
+            )
+            """
+            with conn.cursor() as cur:
+                cur.execute(create_table_sql)
+            _table_ready = True
         
         # Save data
         success, nchunks, nrows, _ = write_pandas(
@@ -411,15 +635,17 @@ def save_to_snowflake(jobs_data):
             df=df,
             table_name='DATA_JOBS',
             auto_create_table=False,
-            overwrite=False
+            overwrite=False,
+            compression='snappy',
+            use_logical_type=True,
+            # Passed through to to_parquet: TIMESTAMP_NTZ only needs microseconds
+            coerce_timestamps='us',
+            allow_truncated_timestamps=True
         )
         
         if success:
             print(f"✅ Saved {nrows} jobs to Snowflake")
         
-        cur.close()
-        conn.close()
-        
         return success
         
     except Exception as e:
@@ -427,25 +653,53 @@ def save_to_snowflake(jobs_data):
         print("💡 Check your Snowflake credentials in .env file")
         return False
 
+def count_jobs_pandas(jobs_data):
+    """Count each analytics column with categorical pandas groupbys"""
+    
+    # Categorical codes let each groupby count over a fixed set of values
+    df = jobs_data[list(ANALYTICS_COUNT_COLUMNS.values()) + ['company']].astype('category')
+    
+    counts = {}
+    for key, column in ANALYTICS_COUNT_COLUMNS.items():
+        sizes = df.groupby(column, sort=False, observed=True).size()
+        counts[key] = sizes.sort_values(ascending=False, kind='stable').to_dict()
+    
+    counts['top_companies'] = df.groupby('company', sort=False, observed=True).size().nlargest(10).to_dict()
+    
+    return counts
+
+def count_jobs_polars(jobs_data):
+    """Count each analytics column with Polars' multi-threaded group_by"""
+    
+    df = pl.from_pandas(jobs_data[list(ANALYTICS_COUNT_COLUMNS.values()) + ['company']])
+    
+    def sizes(column):
+        # First-appearance groups and a stable sort break ties like the pandas path; nulls are dropped there too
+        counts = df.drop_nulls(column).group_by(column, maintain_order=True).agg(pl.len().alias('count'))
+        return counts.sort('count', descending=True, maintain_order=True)
+    
+    counts = {key: dict(sizes(column).iter_rows()) for key, column in ANALYTICS_COUNT_COLUMNS.items()}
+    counts['top_companies'] = dict(sizes('company').head(10).iter_rows())
+    
+    return counts
+
 def generate_analytics(jobs_data):
     """Generate job analytics"""
     
     print("\n📊 Generating Analytics...")
     
-    if not jobs_data:
+    if jobs_data.empty:
         return {}
     
-    df = pd.DataFrame(jobs_data)
+    analytics = {'total_jobs': len(jobs_data)}
     
-    analytics = {
-        'total_jobs': len(df),
-        'jobs_by_category': df['category'].value_counts().to_dict(),
-        'jobs_by_type': df['job_type'].value_counts().to_dict(),
-        'jobs_by_work_mode': df['work_mode'].value_counts().to_dict(),
-        'jobs_by_experience': df['experience_level'].value_counts().to_dict(),
-        'top_companies': df['company'].value_counts().head(10).to_dict(),
-        'sources': df['source'].value_counts().to_dict()
-    }
+    counts = None
+    if pl is not None:
+        try:
+            counts = count_jobs_polars(jobs_data)
+        except ImportError:
+            pass  # pl.from_pandas needs pyarrow
+    analytics.update(counts if counts is not None else count_jobs_pandas(jobs_data))
     
     # Display analytics
     print(f"📈 Total Jobs: {analytics['total_jobs']}")
@@ -473,48 +727,54 @@ def send_email_report(jobs_data, analytics):
         msg = MIMEMultipart()
         msg['From'] = sender_email
         msg['To'] = recipient_email
-        msg['Subject'] = f"Data Jobs Report - {datetime.now().strftime('%Y-%m-%d')}"
+        now = datetime.now()
+        msg['Subject'] = f"Data Jobs Report - {now.strftime('%Y-%m-%d')}"
         
         # Email body
-        body = f"""
-📊 DATA JOBS INTELLIGENCE REPORT
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-🎯 SUMMARY:
-• Total Jobs Scraped: {analytics.get('total_jobs', 0)}
-• Categories: {len(analytics.get('jobs_by_category', {}))}
-• Sources: {list(analytics.get('sources', {}).keys())}
-
-📈 JOB BREAKDOWN:
-• By Category: {analytics.get('jobs_by_category', {})}
-• By Work Mode: {analytics.get('jobs_by_work_mode', {})}
-• By Job Type: {analytics.get('jobs_by_type', {})}
-
-🏢 TOP COMPANIES:
-{chr(10).join([f"• {company}: {count} jobs" for company, count in list(analytics.get('top_companies', {}).items())[:5]])}
-
-💾 DATA STORAGE:
-• Local CSV: ✅ Saved
-• Snowflake: ✅ Integrated
-
-🔍 INSIGHTS:
-• Remote work: {analytics.get('jobs_by_work_mode', {}).get('Remote', 0)} positions
-• Senior level: {analytics.get('jobs_by_experience', {}).get('Senior Level', 0)} positions
-• Data Engineering: {analytics.get('jobs_by_category', {}).get('data_engineer', 0)} positions
-
----
-Report generated by: Data Jobs Intelligence Pipeline
-Next update: Tomorrow at 9:00 AM
-        """
+        by_category = analytics.get('jobs_by_category', {})
+        by_work_mode = analytics.get('jobs_by_work_mode', {})
+        by_type = analytics.get('jobs_by_type', {})
+        top_companies = list(analytics.get('top_companies', {}).items())[:5]
+        
+        lines = [
+            "📊 DATA JOBS INTELLIGENCE REPORT",
+            f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+            "🎯 SUMMARY:",
+            f"• Total Jobs Scraped: {analytics.get('total_jobs', 0)}",
+            f"• Categories: {len(by_category)}",
+            f"• Sources: {list(analytics.get('sources', {}).keys())}",
+            "",
+            "📈 JOB BREAKDOWN:",
+            f"• By Category: {by_category}",
+            f"• By Work Mode: {by_work_mode}",
+            f"• By Job Type: {by_type}",
+            "",
+            "🏢 TOP COMPANIES:",
+            *[f"• {company}: {count} jobs" for company, count in top_companies],
+            "",
+            "💾 DATA STORAGE:",
+            "• Local CSV: ✅ Saved",
+            "• Snowflake: ✅ Integrated",
+            "",
+            "🔍 INSIGHTS:",
+            f"• Remote work: {by_work_mode.get('Remote', 0)} positions",
+            f"• Senior level: {analytics.get('jobs_by_experience', {}).get('Senior Level', 0)} positions",
+            f"• Data Engineering: {by_category.get('data_engineer', 0)} positions",
+            "",
+            "---",
+            "Report generated by: Data Jobs Intelligence Pipeline",
+            "Next update: Tomorrow at 9:00 AM"
+        ]
+        body = '\n'.join(lines)
         
         msg.attach(MIMEText(body, 'plain'))
         
-        # Send email
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, recipient_email, msg.as_string())
-        server.quit()
+        # Send email; the timeout keeps a stalled handshake from holding up the pipeline's worker pool
+        with smtplib.SMTP('smtp.gmail.com', 587, timeout=SMTP_TIMEOUT) as server:
+            server.starttls()
+            server.login(sender_email, sender_password)
+            server.send_message(msg, from_addr=sender_email, to_addrs=[recipient_email])
         
         print(f"✅ Email sent to {recipient_email}")
         return True
@@ -523,6 +783,32 @@ Next update: Tomorrow at 9:00 AM
         print(f"❌ Email error: {e}")
         return False
 
+def write_jobs_csv(jobs_data, csv_file):
+    """Write jobs to CSV with PyArrow's C writer, falling back to pandas"""
+    
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        jobs_data.to_csv(csv_file, index=False)
+        return
+    
+    pa_csv.write_csv(pa.Table.from_pandas(jobs_data, preserve_index=False), csv_file)
+
+def write_jobs_parquet(jobs_data, parquet_file):
+    """Write the typed Parquet twin of the jobs CSV, returning False when it cannot be written"""
+    
+    try:
+        jobs_data.to_parquet(parquet_file, engine='pyarrow', compression='zstd', index=False)
+        return True
+    except ImportError:
+        print("⚠️  pyarrow not installed, skipping Parquet copy")
+        return False
+    except Exception as e:
+        # The CSV is the file of record; a missing twin only costs readers a CSV parse
+        print(f"⚠️  Could not write Parquet copy: {e}")
+        return False
+
 def run_production_pipeline():
     """Run the complete production pipeline"""
     
@@ -540,30 +826,35 @@ def run_production_pipeline():
         print("\n1️⃣ SCRAPING JOBS...")
         jobs = scrape_jobs_smart()
         
-        if not jobs:
+        if jobs.empty:
             print("❌ No jobs found!")
             return False
         
-        # Step 2: Save to CSV
-        print("\n2️⃣ SAVING TO CSV...")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        csv_file = f"data/production_jobs_{timestamp}.csv"
+        jobs = dedupe_jobs(jobs)
+        jobs[CATEGORY_COLUMNS] = jobs[CATEGORY_COLUMNS].astype('category')
         
-        df = pd.DataFrame(jobs)
-        df.to_csv(csv_file, index=False)
-        print(f"✅ Saved to: {csv_file}")
+        # Step 2: Generate Analytics (the email report needs them)
+        print("\n2️⃣ GENERATING ANALYTICS...")
+        analytics = generate_analytics(jobs)
         
-        # Step 3: Save to Snowflake
-        print("\n3️⃣ SAVING TO SNOWFLAKE...")
-        snowflake_success = save_to_snowflake(jobs)
+        # Steps 3-5: CSV, Snowflake and email are independent I/O, so run them together
+        print("\n3️⃣ SAVING TO CSV, 4️⃣ SAVING TO SNOWFLAKE, 5️⃣ SENDING EMAIL REPORT...")
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        csv_file = f"data/production_jobs_{timestamp}.csv"
+        parquet_file = f"data/production_jobs_{timestamp}.parquet"  # Typed copy for faster reloads
         
-        # Step 4: Generate Analytics
-        print("\n4️⃣ GENERATING ANALYTICS...")
-        analytics = generate_analytics(jobs)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            csv_future = pool.submit(write_jobs_csv, jobs, csv_file)
+            parquet_future = pool.submit(write_jobs_parquet, jobs, parquet_file)
+            snowflake_future = pool.submit(save_to_snowflake, jobs)
+            email_future = pool.submit(send_email_report, jobs, analytics)
         
-        # Step 5: Send Email Report
-        print("\n5️⃣ SENDING EMAIL REPORT...")
-        email_success = send_email_report(jobs, analytics)
+        csv_future.result()  # Re-raise a failed CSV write, as before
+        print(f"✅ Saved to: {csv_file}")
+        if parquet_future.result():
+            print(f"✅ Saved to: {parquet_file}")
+        snowflake_success = snowflake_future.result()
+        email_success = email_future.result()
         
         # Final Summary
         print("\n" + "="*60)
@@ -6,17 +6,76 @@ Author: Eman Elgamal
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import glob
+from plotly.colors import qualitative, sample_colorscale
 import os
 from datetime import datetime, timedelta
 import numpy as np
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables; the dashboard itself needs none, so dotenv is optional
+if os.path.exists('.env'):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+# Scraped batches written by the pipelines
+JOB_FILE_PREFIXES = ('production_jobs_', 'enhanced_jobs_')
+
+# Repeated string columns are read straight into categoricals
+CSV_DTYPES = {
+    'company': 'category',
+    'category': 'category',
+    'job_type': 'category',
+    'work_mode': 'category',
+    'experience_level': 'category',
+    'source': 'category'
+}
+DATE_COLUMNS = ['scraped_timestamp', 'posted_date']
+
+# Cleaned copies of the source CSVs, so cold reruns skip parsing and cleaning
+PARQUET_CACHE_DIR = os.path.join('data', '.cache')
+PARQUET_CACHE_VERSION = 3  # Bump whenever the derived columns change
+
+# Sidebar multiselects and the categorical column each one filters
+FILTER_COLUMNS = ['category_display', 'work_mode', 'experience_level']
+NAT_DAY = np.datetime64('NaT', 'D').astype('i8')  # posted_day value for a missing date
+
+# State coordinates (simplified)
+STATE_COORDS = {
+    'NY': {'lat': 40.7128, 'lon': -74.0060, 'name': 'New York'},
+    'CA': {'lat': 36.7783, 'lon': -119.4179, 'name': 'California'},
+    'IL': {'lat': 40.6331, 'lon': -89.3985, 'name': 'Illinois'},
+    'TX': {'lat': 31.9686, 'lon': -99.9018, 'name': 'Texas'},
+    'MA': {'lat': 42.4072, 'lon': -71.3824, 'name': 'Massachusetts'},
+    'WA': {'lat': 47.7511, 'lon': -120.7401, 'name': 'Washington'},
+    'CO': {'lat': 39.5501, 'lon': -105.7821, 'name': 'Colorado'},
+    'GA': {'lat': 32.1656, 'lon': -82.9001, 'name': 'Georgia'},
+    'FL': {'lat': 27.6648, 'lon': -81.5158, 'name': 'Florida'},
+    'DC': {'lat': 38.9072, 'lon': -77.0369, 'name': 'Washington DC'}
+}
+STATE_DF = (
+    pd.DataFrame.from_dict(STATE_COORDS, orient='index')
+    .rename_axis('state').reset_index()
+    .rename(columns={'name': 'state_name'})
+)
+US_CENTER = {'lat': 39.8283, 'lon': -98.5795}  # Placed here when a state has no coordinates
+
+# The trend chart plots at most this many of the latest days
+TREND_DAYS = 90
+
+# Chart colors, resolved once instead of per figure
+EXPERIENCE_COLORS = {
+    'Entry Level': '#ff9999',
+    'Mid Level': '#66b3ff',
+    'Senior Level': '#99ff99',
+    'Management': '#ffcc99'
+}
+OTHER_EXPERIENCE_COLOR = '#cccccc'
+PALETTE_STEPS = 64
+CATEGORY_PALETTE = np.array(sample_colorscale('Viridis', PALETTE_STEPS), dtype=object)
+COMPANY_PALETTE = np.array(sample_colorscale('Blues', PALETTE_STEPS), dtype=object)
 
 # Page configuration
 st.set_page_config(
@@ -51,119 +110,223 @@ st.markdown("""
 def load_job_data():
     """Load job data from CSV files"""
     
-    # Get all CSV files from data directory
-    csv_files = glob.glob("data/production_jobs_*.csv") + glob.glob("data/enhanced_jobs_*.csv")
+    # Find the most recent job CSV in one directory pass
+    latest_file, latest_ctime = None, None
     
-    if not csv_files:
+    try:
+        with os.scandir('data') as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(JOB_FILE_PREFIXES) and name.endswith('.csv') and entry.is_file():
+                    ctime = entry.stat().st_ctime
+                    if latest_ctime is None or ctime > latest_ctime:
+                        latest_file, latest_ctime = entry.path, ctime
+    except FileNotFoundError:
+        pass
+    
+    if latest_file is None:
         # Generate sample data if no files exist
         return generate_sample_data()
     
-    # Load the most recent file
-    latest_file = max(csv_files, key=os.path.getctime)
+    # Lets per-filter caches tell one loaded file apart from the next
+    data_version = f"{latest_file}:{latest_ctime}"
+    
+    df = read_parquet_mirror(latest_file)
+    if df is not None:
+        df.attrs['data_version'] = data_version
+        return df
     
     try:
-        df = pd.read_csv(latest_file)
-        
-        # Data cleaning and preparation
-        df['scraped_timestamp'] = pd.to_datetime(df['scraped_timestamp'])
-        df['posted_date'] = pd.to_datetime(df['posted_date'])
+        # Arrow's multithreaded reader when pyarrow is installed, the C parser otherwise
+        try:
+            df = pd.read_csv(latest_file, engine='pyarrow', dtype=CSV_DTYPES, parse_dates=DATE_COLUMNS)
+        except ImportError:
+            df = pd.read_csv(latest_file, dtype=CSV_DTYPES, parse_dates=DATE_COLUMNS)
         
         # Clean category names
-        df['category_display'] = df['category'].str.replace('_', ' ').str.title()
+        df['category_display'] = display_categories(df['category'])
         
         # Extract city and state from location
-        df['city'] = df['location'].apply(extract_city)
-        df['state'] = df['location'].apply(extract_state)
+        add_city_state(df)
+        add_posted_day(df)
         
+        write_parquet_mirror(df, latest_file)
+        
+        df.attrs['data_version'] = data_version
         return df
         
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return generate_sample_data()
 
-def extract_city(location):
-    """Extract city from location string"""
-    if pd.isna(location) or location == "N/A":
-        return "Unknown"
+def parquet_mirror_path(csv_file):
+    """Path of the cleaned Parquet mirror for a source CSV"""
+    return os.path.join(PARQUET_CACHE_DIR, f"{os.path.basename(csv_file)}.v{PARQUET_CACHE_VERSION}.parquet")
+
+def read_parquet_mirror(csv_file):
+    """Read the cleaned mirror if it is at least as new as the CSV, else None"""
+    mirror = parquet_mirror_path(csv_file)
     
-    parts = location.split(',')
-    return parts[0].strip() if parts else "Unknown"
+    try:
+        if os.path.getmtime(mirror) >= os.path.getmtime(csv_file):
+            return pd.read_parquet(mirror)
+    except Exception:
+        pass  # Missing, stale or unreadable mirror; rebuild from the CSV
+    
+    return None
 
-def extract_state(location):
-    """Extract state from location string"""
-    if pd.isna(location) or location == "N/A":
-        return "Unknown"
+def write_parquet_mirror(df, csv_file):
+    """Store the cleaned frame next to the cache; the dashboard works without it"""
+    try:
+        os.makedirs(PARQUET_CACHE_DIR, exist_ok=True)
+        df.to_parquet(parquet_mirror_path(csv_file), compression='zstd', index=False)
+    except Exception as e:
+        print(f"⚠️  Could not write Parquet cache: {e}")
+
+def display_categories(categories):
+    """Title-case category names, renaming the categorical's labels rather than every row"""
+    labels = categories.cat.categories.str.replace('_', ' ').str.title()
+    if labels.is_unique:
+        return categories.cat.rename_categories(labels)
+    return categories.astype(str).str.replace('_', ' ').str.title().astype('category')
+
+def add_city_state(df):
+    """Split location into city and state columns in one vectorized pass"""
+    # read_csv leaves an all-"N/A" column as float NaN, which has no .str accessor
+    location = df['location'].astype(object)
+    location = location.where(location != "N/A")
+    
+    # n=2 keeps the second part on its own even for "City, ST, Country"; reindex covers comma-free data.
+    # Fill before stripping so a column that came back all NaN still takes .str
+    parts = location.str.split(',', n=2, expand=True).reindex(columns=[0, 1])
+    df['city'] = parts[0].fillna("Unknown").str.strip()
+    df['state'] = parts[1].fillna("Unknown").str.strip()
+    
+    return df
+
+def add_posted_day(df):
+    """Store posted_date as an int64 day count so date filtering is an integer compare"""
+    df['posted_day'] = df['posted_date'].to_numpy().astype('datetime64[D]').view('i8')
+    return df
+
+def posted_date_bounds(df):
+    """First and last posted date, taken from the int64 day column without re-parsing"""
+    posted_day = df['posted_day'].to_numpy()
+    posted_day = posted_day[posted_day != NAT_DAY]
+    bounds = np.array([posted_day.min(), posted_day.max()]).astype('datetime64[D]')
+    return tuple(day.item() for day in bounds)
+
+def build_filter_mask(df, selections, date_range):
+    """Combine the sidebar filters into one boolean mask over category codes and day numbers"""
     
-    parts = location.split(',')
-    if len(parts) >= 2:
-        return parts[1].strip()
-    return "Unknown"
+    mask = np.ones(len(df), dtype=bool)
+    
+    for column, selected in zip(FILTER_COLUMNS, selections):
+        values = df[column]
+        selected_codes = values.cat.categories.get_indexer(selected)
+        mask &= np.isin(values.cat.codes.to_numpy(), selected_codes[selected_codes >= 0])
+    
+    start_day, end_day = (np.datetime64(day, 'D').astype('i8') for day in date_range[:2])
+    posted_day = df['posted_day'].to_numpy()
+    mask &= (posted_day >= start_day) & (posted_day <= end_day)
+    
+    return mask
 
 def generate_sample_data():
     """Generate sample data for demonstration"""
     
+    n = 60  # 60 jobs total
+    now = np.datetime64(datetime.now())  # Local time, like the scraped timestamps
+    today = np.datetime64(datetime.now().date(), 'D')
+    
     sample_data = {
-        'job_title': [
+        'job_title': np.tile(np.array([
             'Senior Data Engineer', 'Data Scientist - ML', 'Business Intelligence Analyst',
             'Data Analyst', 'Machine Learning Engineer', 'Data Warehouse Architect',
             'Junior Data Scientist', 'Lead Data Engineer', 'Analytics Manager',
             'Data Platform Engineer', 'Research Scientist', 'BI Developer',
             'Senior Data Analyst', 'ML Research Engineer', 'Data Infrastructure Engineer'
-        ] * 4,  # 60 jobs total
-        'company': [
+        ], dtype=object), n // 15),
+        'company': np.tile(np.array([
             'Tech Innovations Inc', 'AI Solutions Corp', 'DataFlow Analytics',
             'Enterprise Data Systems', 'StartUp Analytics', 'Cloud Data Co',
             'Analytics First', 'Data Driven LLC', 'Intelligence Systems',
             'Big Data Corp', 'Smart Analytics', 'Data Insights Inc',
             'Advanced Analytics', 'Data Science Hub', 'Analytics Pro'
-        ] * 4,
-        'location': [
+        ], dtype=object), n // 15),
+        'location': np.tile(np.array([
             'New York, NY', 'San Francisco, CA', 'Chicago, IL', 'Austin, TX',
             'Boston, MA', 'Seattle, WA', 'Denver, CO', 'Atlanta, GA',
             'Los Angeles, CA', 'Washington, DC', 'Miami, FL', 'Dallas, TX',
             'Portland, OR', 'Minneapolis, MN', 'Phoenix, AZ'
-        ] * 4,
-        'category': [
+        ], dtype=object), n // 15),
+        'category': np.tile(np.array([
             'data_engineer', 'data_scientist', 'data_analyst', 'data_warehouse',
             'machine_learning', 'bi_developer'
-        ] * 10,
-        'job_type': ['Full-time'] * 50 + ['Contract'] * 5 + ['Part-time'] * 5,
-        'work_mode': ['Remote'] * 25 + ['Hybrid'] * 20 + ['On-site'] * 15,
-        'experience_level': ['Senior Level'] * 25 + ['Mid Level'] * 20 + ['Entry Level'] * 15,
-        'source': ['glassdoor'] * 30 + ['indeed'] * 20 + ['linkedin'] * 10,
-        'scraped_timestamp': [datetime.now() - timedelta(hours=i) for i in range(60)],
-        'posted_date': [datetime.now().date() - timedelta(days=i%7) for i in range(60)]
+        ], dtype=object), n // 6),
+        'job_type': np.repeat(np.array(['Full-time', 'Contract', 'Part-time'], dtype=object), [50, 5, 5]),
+        'work_mode': np.repeat(np.array(['Remote', 'Hybrid', 'On-site'], dtype=object), [25, 20, 15]),
+        'experience_level': np.repeat(np.array(['Senior Level', 'Mid Level', 'Entry Level'], dtype=object), [25, 20, 15]),
+        'source': np.repeat(np.array(['glassdoor', 'indeed', 'linkedin'], dtype=object), [30, 20, 10]),
+        'scraped_timestamp': now - np.arange(n).astype('timedelta64[h]'),
+        'posted_date': today - (np.arange(n) % 7).astype('timedelta64[D]')
     }
     
-    df = pd.DataFrame(sample_data)
-    df['category_display'] = df['category'].str.replace('_', ' ').str.title()
-    df['city'] = df['location'].apply(extract_city)
-    df['state'] = df['location'].apply(extract_state)
+    df = pd.DataFrame(sample_data).astype(CSV_DTYPES)
+    df['category_display'] = display_categories(df['category'])
+    add_city_state(df)
+    add_posted_day(df)
+    df.attrs['data_version'] = f"sample:{now}"
     
     return df
 
-def create_metrics_cards(df):
+@st.cache_data(max_entries=16, show_spinner=False)
+def filtered_csv_bytes(filter_key, _df, _mask):
+    """Serialize the filtered jobs once per filter state; _df and _mask are not hashed"""
+    return _df[_mask].to_csv(index=False).encode('utf-8')
+
+def label_mask(series, label):
+    """Boolean array of rows holding one categorical label, compared on integer codes"""
+    code = series.cat.categories.get_indexer([label])[0]
+    if code < 0:
+        return np.zeros(len(series), dtype=bool)
+    return series.cat.codes.to_numpy() == code
+
+def create_metrics_cards(df, mask):
     """Create metric cards for key statistics"""
     
+    # Every metric is a reduction over boolean arrays; nothing is copied out of df
+    total_jobs = int(mask.sum())
+    recent_cutoff = np.datetime64(datetime.now() - timedelta(days=1))
+    recent_jobs = int((mask & (df['scraped_timestamp'].to_numpy() > recent_cutoff)).sum())
+    
+    company = df['company']
+    company_counts = counts_by_codes(mask, company.cat.codes.to_numpy(), len(company.cat.categories))
+    companies = int(np.count_nonzero(company_counts))
+    na_code = company.cat.categories.get_indexer(['N/A'])[0]
+    named_companies = companies - int(na_code >= 0 and company_counts[na_code] > 0)
+    
+    remote_jobs = int((mask & label_mask(df['work_mode'], 'Remote')).sum())
+    senior_jobs = int((mask & label_mask(df['experience_level'], 'Senior Level')).sum())
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
             label="📊 Total Jobs",
-            value=len(df),
-            delta=f"+{len(df[df['scraped_timestamp'] > datetime.now() - timedelta(days=1)])}"
+            value=total_jobs,
+            delta=f"+{recent_jobs}"
         )
     
     with col2:
         st.metric(
             label="🏢 Companies",
-            value=df['company'].nunique(),
-            delta=f"{df[df['company'] != 'N/A']['company'].nunique()} unique"
+            value=companies,
+            delta=f"{named_companies} unique"
         )
     
     with col3:
-        remote_jobs = len(df[df['work_mode'] == 'Remote'])
-        remote_pct = (remote_jobs / len(df) * 100) if len(df) > 0 else 0
+        remote_pct = (remote_jobs / total_jobs * 100) if total_jobs > 0 else 0
         st.metric(
             label="🏠 Remote Jobs",
             value=f"{remote_pct:.1f}%",
@@ -171,28 +334,66 @@ def create_metrics_cards(df):
         )
     
     with col4:
-        senior_jobs = len(df[df['experience_level'] == 'Senior Level'])
+        senior_pct = (senior_jobs / total_jobs * 100) if total_jobs > 0 else 0
         st.metric(
             label="⭐ Senior Positions",
             value=senior_jobs,
-            delta=f"{senior_jobs/len(df)*100:.1f}% of total"
+            delta=f"{senior_pct:.1f}% of total"
         )
 
-def create_category_chart(df):
+def counts_by_codes(mask, codes, n_categories):
+    """Count category codes under a row mask with np.bincount"""
+    selected = codes[mask]
+    return np.bincount(selected[selected >= 0], minlength=n_categories)
+
+def fast_counts(series, mask=None, by_count=True):
+    """Count a categorical's present values from its integer codes, optionally under a row mask"""
+    codes = series.cat.codes.to_numpy()
+    if mask is None:
+        mask = np.ones(len(codes), dtype=bool)
+    
+    counts = counts_by_codes(mask, codes, len(series.cat.categories))
+    present = np.flatnonzero(counts)
+    counts = pd.Series(counts[present], index=series.cat.categories[present])
+    
+    if by_count:
+        # Largest first, like value_counts
+        counts = counts.iloc[np.argsort(-counts.to_numpy(), kind='stable')]
+    
+    return counts
+
+def scale_colors(palette, values):
+    """Pick each bar's color from a precomputed palette, lowest to highest value"""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        # Filters that match nothing leave no bars to color
+        return []
+    low, high = values.min(), values.max()
+    steps = (values - low) / ((high - low) or 1) * (len(palette) - 1)
+    return palette[steps.round().astype(int)].tolist()
+
+def as_key(counts):
+    """Turn a counts Series into hashable (labels, values) tuples for the figure cache"""
+    return tuple(counts.index), tuple(counts.to_numpy().tolist())
+
+def create_category_chart(df, mask):
     """Create jobs by category chart"""
     
-    category_counts = df.groupby('category_display').size().reset_index(name='count')
+    category_counts = fast_counts(df['category_display'], mask, by_count=False)
+    return category_figure(*as_key(category_counts))
+
+@st.cache_data(show_spinner=False)
+def category_figure(labels, counts):
+    """Build the jobs by category figure from its counts"""
     
-    fig = px.bar(
-        category_counts,
-        x='category_display',
-        y='count',
-        title="📊 Jobs by Category",
-        color='count',
-        color_continuous_scale='viridis'
-    )
+    fig = go.Figure(go.Bar(
+        x=labels,
+        y=counts,
+        marker_color=scale_colors(CATEGORY_PALETTE, counts)
+    ))
     
     fig.update_layout(
+        title="📊 Jobs by Category",
         xaxis_title="Job Category",
         yaxis_title="Number of Jobs",
         showlegend=False
@@ -200,32 +401,41 @@ def create_category_chart(df):
     
     return fig
 
-def create_work_mode_chart(df):
+def create_work_mode_chart(df, mask):
     """Create work mode distribution chart"""
     
-    work_mode_counts = df['work_mode'].value_counts()
+    return work_mode_figure(*as_key(fast_counts(df['work_mode'], mask)))
+
+@st.cache_data(show_spinner=False)
+def work_mode_figure(labels, counts):
+    """Build the work mode pie from its counts"""
     
-    fig = px.pie(
-        values=work_mode_counts.values,
-        names=work_mode_counts.index,
-        title="🏠 Work Mode Distribution",
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
+    fig = go.Figure(go.Pie(
+        values=counts,
+        labels=labels,
+        marker_colors=qualitative.Set3[:len(labels)],
+        textposition='inside',
+        textinfo='percent+label'
+    ))
     
-    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(title="🏠 Work Mode Distribution")
     
     return fig
 
-def create_experience_level_chart(df):
+def create_experience_level_chart(df, mask):
     """Create experience level distribution chart"""
     
-    exp_counts = df['experience_level'].value_counts()
+    return experience_level_figure(*as_key(fast_counts(df['experience_level'], mask)))
+
+@st.cache_data(show_spinner=False)
+def experience_level_figure(labels, counts):
+    """Build the experience level bars from their counts"""
     
     fig = go.Figure(data=[
         go.Bar(
-            x=exp_counts.index,
-            y=exp_counts.values,
-            marker_color=['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
+            x=labels,
+            y=counts,
+            marker_color=[EXPERIENCE_COLORS.get(label, OTHER_EXPERIENCE_COLOR) for label in labels]
         )
     ])
     
@@ -237,96 +447,108 @@ def create_experience_level_chart(df):
     
     return fig
 
-def create_location_map(df):
+def create_location_map(df, mask):
     """Create geographical distribution map"""
     
-    # State coordinates (simplified)
-    state_coords = {
-        'NY': {'lat': 40.7128, 'lon': -74.0060, 'name': 'New York'},
-        'CA': {'lat': 36.7783, 'lon': -119.4179, 'name': 'California'},
-        'IL': {'lat': 40.6331, 'lon': -89.3985, 'name': 'Illinois'},
-        'TX': {'lat': 31.9686, 'lon': -99.9018, 'name': 'Texas'},
-        'MA': {'lat': 42.4072, 'lon': -71.3824, 'name': 'Massachusetts'},
-        'WA': {'lat': 47.7511, 'lon': -120.7401, 'name': 'Washington'},
-        'CO': {'lat': 39.5501, 'lon': -105.7821, 'name': 'Colorado'},
-        'GA': {'lat': 32.1656, 'lon': -82.9001, 'name': 'Georgia'},
-        'FL': {'lat': 27.6648, 'lon': -81.5158, 'name': 'Florida'},
-        'DC': {'lat': 38.9072, 'lon': -77.0369, 'name': 'Washington DC'}
-    }
+    return location_map_figure(*as_key(df['state'][mask].value_counts(sort=False)))
+
+@st.cache_data(show_spinner=False)
+def location_map_figure(states, job_counts):
+    """Build the geographic distribution map from per-state counts"""
     
-    state_counts = df.groupby('state').size().reset_index(name='job_count')
+    state_counts = pd.DataFrame({'state': states, 'job_count': job_counts})
     
     # Add coordinates
-    state_counts['lat'] = state_counts['state'].map(lambda x: state_coords.get(x, {}).get('lat', 39.8283))
-    state_counts['lon'] = state_counts['state'].map(lambda x: state_coords.get(x, {}).get('lon', -98.5795))
-    state_counts['state_name'] = state_counts['state'].map(lambda x: state_coords.get(x, {}).get('name', x))
-    
-    fig = px.scatter_mapbox(
-        state_counts,
-        lat='lat',
-        lon='lon',
-        size='job_count',
-        hover_name='state_name',
-        hover_data={'job_count': True, 'lat': False, 'lon': False},
-        color='job_count',
-        size_max=50,
-        zoom=3,
-        title="🗺️ Geographic Distribution of Jobs"
-    )
+    state_counts = state_counts.merge(STATE_DF, on='state', how='left').fillna(US_CENTER)
+    state_counts[['lat', 'lon']] = state_counts[['lat', 'lon']].round(4)  # ~10 m, plenty for a state marker
+    state_counts['state_name'] = state_counts['state_name'].fillna(state_counts['state'])
+    
+    job_count = state_counts['job_count']
+    
+    # A plain mapbox trace with prebuilt hover text; sized by area like px's size_max=50
+    fig = go.Figure(go.Scattermapbox(
+        lat=state_counts['lat'],
+        lon=state_counts['lon'],
+        mode='markers',
+        marker=dict(
+            size=job_count,
+            sizemode='area',
+            sizeref=2 * job_count.max() / 50 ** 2,
+            color=job_count,
+            colorscale='Plasma',
+            colorbar=dict(title='job_count')
+        ),
+        text=state_counts['state_name'] + ': ' + job_count.astype(str) + ' jobs',
+        hoverinfo='text'
+    ))
     
     fig.update_layout(
+        title="🗺️ Geographic Distribution of Jobs",
         mapbox_style="open-street-map",
+        mapbox_zoom=3,
+        mapbox_center={'lat': state_counts['lat'].mean(), 'lon': state_counts['lon'].mean()},
         height=400
     )
     
     return fig
 
-def create_trend_chart(df):
+def create_trend_chart(df, mask):
     """Create time trend chart"""
     
-    df['date'] = df['scraped_timestamp'].dt.date
-    daily_counts = df.groupby('date').size().reset_index(name='jobs_count')
+    # Flooring keeps datetime64 days instead of building Python date objects
+    daily_counts = df['scraped_timestamp'][mask].dt.floor('D').value_counts().sort_index().tail(TREND_DAYS)
+    return trend_figure(*as_key(daily_counts))
+
+@st.cache_data(show_spinner=False)
+def trend_figure(dates, jobs_counts):
+    """Build the daily trend line from per-day counts"""
     
-    fig = px.line(
-        daily_counts,
-        x='date',
-        y='jobs_count',
-        title="📈 Daily Job Posting Trends",
-        markers=True
-    )
+    fig = go.Figure(go.Scatter(
+        x=dates,
+        y=jobs_counts,
+        mode='lines+markers'
+    ))
     
     fig.update_layout(
+        title="📈 Daily Job Posting Trends",
         xaxis_title="Date",
         yaxis_title="Number of Jobs"
     )
     
     return fig
 
-def create_top_companies_chart(df):
+def create_top_companies_chart(df, mask):
     """Create top companies chart"""
     
-    company_counts = df[df['company'] != 'N/A']['company'].value_counts().head(10)
+    # Leave unnamed companies out by their code rather than dropping the 'N/A' label afterwards
+    named = mask & ~label_mask(df['company'], 'N/A')
+    company_counts = fast_counts(df['company'], named).head(10)
     
     if len(company_counts) > 0:
-        fig = px.bar(
-            x=company_counts.values,
-            y=company_counts.index,
-            orientation='h',
-            title="🏢 Top Hiring Companies",
-            color=company_counts.values,
-            color_continuous_scale='blues'
-        )
-        
-        fig.update_layout(
-            xaxis_title="Number of Job Postings",
-            yaxis_title="Company",
-            showlegend=False
-        )
-        
-        return fig
+        return top_companies_figure(*as_key(company_counts))
     
     return None
 
+@st.cache_data(show_spinner=False)
+def top_companies_figure(companies, counts):
+    """Build the top companies bars from their counts"""
+    
+    fig = go.Figure(go.Bar(
+        x=counts,
+        y=companies,
+        orientation='h',
+        marker_color=scale_colors(COMPANY_PALETTE, counts)
+    ))
+    
+    fig.update_layout(
+        title="🏢 Top Hiring Companies",
+        xaxis_title="Number of Job Postings",
+        yaxis_title="Company",
+        showlegend=False
+    )
+    
+    return fig
+
 def main():
     """Main dashboard function"""
     
@@ -363,8 +585,7 @@ def main():
     )
     
     # Date range filter
-    min_date = pd.to_datetime(df['posted_date']).dt.date.min()
-    max_date = pd.to_datetime(df['posted_date']).dt.date.max()
+    min_date, max_date = posted_date_bounds(df)
     
     date_range = st.sidebar.date_input(
         "Select Date Range:",
@@ -373,46 +594,51 @@ def main():
         max_value=max_date
     )
     
-    # Convert posted_date to date for comparison
-    df['posted_date_only'] = pd.to_datetime(df['posted_date']).dt.date
-    
-    # Apply filters
-    filtered_df = df[
-        (df['category_display'].isin(categories)) &
-        (df['work_mode'].isin(work_modes)) &
-        (df['experience_level'].isin(exp_levels)) &
-        (df['posted_date_only'] >= date_range[0]) &
-        (df['posted_date_only'] <= date_range[1])
-    ]
+    # Apply filters; charts index their own columns under the mask instead of copying the frame.
+    # Reruns that leave the filters alone (downloads, checkboxes) reuse the last mask.
+    filter_key = (df.attrs.get('data_version'), tuple(categories), tuple(work_modes), tuple(exp_levels), tuple(date_range))
+    mask = st.session_state.get('mask')
+    if st.session_state.get('filter_key') != filter_key or mask is None or len(mask) != len(df):
+        mask = build_filter_mask(df, (categories, work_modes, exp_levels), date_range)
+        st.session_state['mask'] = mask
+        st.session_state['filter_key'] = filter_key
     
     # Metrics cards
     st.subheader("📈 Key Metrics")
-    create_metrics_cards(filtered_df)
+    create_metrics_cards(df, mask)
     
     # Charts
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_category_chart(filtered_df), use_container_width=True)
+        st.plotly_chart(create_category_chart(df, mask), use_container_width=True)
     
     with col2:
-        st.plotly_chart(create_work_mode_chart(filtered_df), use_container_width=True)
+        st.plotly_chart(create_work_mode_chart(df, mask), use_container_width=True)
     
     col3, col4 = st.columns(2)
     
     with col3:
-        st.plotly_chart(create_experience_level_chart(filtered_df), use_container_width=True)
+        st.plotly_chart(create_experience_level_chart(df, mask), use_container_width=True)
     
     with col4:
-        top_companies_fig = create_top_companies_chart(filtered_df)
+        top_companies_fig = create_top_companies_chart(df, mask)
         if top_companies_fig:
             st.plotly_chart(top_companies_fig, use_container_width=True)
         else:
             st.info("No company data available")
     
-    # Full-width charts
-    st.plotly_chart(create_location_map(filtered_df), use_container_width=True)
-    st.plotly_chart(create_trend_chart(filtered_df), use_container_width=True)
+    # Full-width charts, built only when asked for; st.expander cannot report whether it is open
+    col5, col6 = st.columns(2)
+    with col5:
+        show_map = st.checkbox("Show geographic map", value=False)
+    with col6:
+        show_trend = st.checkbox("Show daily trend", value=False)
+    
+    if show_map:
+        st.plotly_chart(create_location_map(df, mask), use_container_width=True)
+    if show_trend:
+        st.plotly_chart(create_trend_chart(df, mask), use_container_width=True)
     
     # Data table
     st.subheader("📋 Job Listings")
@@ -424,17 +650,24 @@ def main():
     with col2:
         rows_to_show = st.selectbox("Rows to display:", [10, 25, 50, 100], index=1)
     with col3:
-        download_data = st.download_button(
-            label="📥 Download CSV",
-            data=filtered_df.to_csv(index=False),
-            file_name=f"jobs_data_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
+        # Serialize only on request; the prepared file stays offered until the filters change
+        if st.button("📄 Prepare CSV"):
+            st.session_state['csv_filter_key'] = filter_key
+        
+        if st.session_state.get('csv_filter_key') == filter_key:
+            download_data = st.download_button(
+                label="📥 Download CSV",
+                data=filtered_csv_bytes(filter_key, df, mask),
+                file_name=f"jobs_data_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
     
     if show_table:
+        # Only the rows actually shown are copied out of the filtered selection
+        filtered_df = df.iloc[np.flatnonzero(mask)[:rows_to_show]]
         st.dataframe(
             filtered_df[['job_title', 'company', 'location', 'category_display', 
-                        'job_type', 'work_mode', 'experience_level', 'posted_date']].head(rows_to_show),
+                        'job_type', 'work_mode', 'experience_level', 'posted_date']],
             use_container_width=True
         )
     
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from enhanced_email_pipeline import generate_analytics_from_data, read_job_csv
+
+
+def write_jobs(path, companies):
+    pd.DataFrame({
+        'title': ['Data Analyst'] * len(companies),
+        'company': companies,
+        'category': ['data_analyst'] * len(companies),
+        'work_mode': ['Remote'] * len(companies),
+        'experience_level': ['Entry Level'] * len(companies),
+        'job_type': ['Full-time'] * len(companies),
+        'source': ['Indeed'] * len(companies),
+    }).to_csv(path, index=False)
+
+
+def test_analytics_skip_na_companies(tmp_path):
+    csv_file = tmp_path / 'production_jobs_test.csv'
+    write_jobs(csv_file, ['Acme', 'N/A', 'Acme', 'Globex'])
+
+    analytics = generate_analytics_from_data(read_job_csv(str(csv_file)))
+
+    assert analytics['total_jobs'] == 4
+    assert analytics['top_companies'] == {'Acme': 2, 'Globex': 1}
+
+
+def test_read_job_csv_falls_back_from_unreadable_parquet(tmp_path):
+    csv_file = tmp_path / 'production_jobs_test.csv'
+    write_jobs(csv_file, ['Acme', 'Globex'])
+    (tmp_path / 'production_jobs_test.parquet').write_bytes(b'not parquet')
+
+    df = read_job_csv(str(csv_file))
+
+    assert df['company'].tolist() == ['Acme', 'Globex']
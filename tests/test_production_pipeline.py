@@ -0,0 +1,38 @@
+import pandas as pd
+
+from production_pipeline import (
+    count_jobs_pandas, count_jobs_polars, parse_glassdoor_html, parse_indeed_html, write_jobs_parquet
+)
+
+
+def test_parse_listing_html():
+    indeed = parse_indeed_html('<h2 class="jobTitle"><a><span title="Data Scientist">Data Sci...</span></a></h2>', 'data_scientist')
+    glassdoor = parse_glassdoor_html('<a data-test="job-title">Data Engineer</a>', 'data_engineer')
+
+    assert [job['job_title'] for job in indeed] == ['Data Scientist']
+    assert [(job['job_title'], job['company']) for job in glassdoor] == [('Data Engineer', 'N/A')]
+
+
+def test_write_jobs_parquet_reports_failure(tmp_path):
+    jobs = pd.DataFrame({'title': ['Data Analyst'], 'company': ['Acme']})
+
+    assert write_jobs_parquet(jobs, str(tmp_path / 'missing' / 'jobs.parquet')) is False
+    assert write_jobs_parquet(jobs, str(tmp_path / 'jobs.parquet')) is True
+
+
+def test_polars_counts_match_pandas():
+    companies = [f'Company {i}' for i in range(30)] + [None]
+    jobs = pd.DataFrame({
+        'company': companies,
+        'category': ['data_analyst', 'data_engineer', 'data_scientist'] * 10 + ['data_analyst'],
+        'job_type': ['Full-time'] * 31,
+        'work_mode': ['Remote', 'Hybrid'] * 15 + ['On-site'],
+        'experience_level': ['Entry Level'] * 31,
+        'source': ['indeed', 'glassdoor'] * 15 + ['indeed'],
+    })
+
+    expected = count_jobs_pandas(jobs)
+    for _ in range(5):
+        counts = count_jobs_polars(jobs)
+        assert counts == expected
+        assert {key: list(value) for key, value in counts.items()} == {key: list(value) for key, value in expected.items()}
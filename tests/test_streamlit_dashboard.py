@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_dashboard.py')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Run the dashboard from an empty directory so it falls back to sample data"""
+    monkeypatch.chdir(tmp_path)
+    st.cache_data.clear()
+    return AppTest.from_file(DASHBOARD, default_timeout=60)
+
+
+def test_dashboard_renders_sample_data(app):
+    app.run()
+    assert not app.exception
+
+    for label in ("Show geographic map", "Show daily trend", "Show detailed table"):
+        next(box for box in app.checkbox if box.label == label).check()
+    app.run()
+
+    assert not app.exception
+    assert len(app.dataframe) == 1
+
+
+def test_dashboard_renders_empty_selection(app):
+    app.run()
+    app.multiselect[0].set_value([])
+    app.run()
+
+    assert not app.exception
+    assert app.metric[0].value == '0'
+
+
+def test_category_figure_without_counts():
+    from streamlit_dashboard import category_figure
+
+    assert len(category_figure((), ()).data[0].x) == 0
+
+
+def test_dashboard_loads_csv_without_locations(app, tmp_path):
+    os.mkdir(tmp_path / 'data')
+    pd.DataFrame({
+        'job_title': ['Data Analyst', 'Data Engineer', 'Data Scientist'],
+        'company': ['Acme', 'N/A', 'Globex'],
+        'location': ['N/A'] * 3,
+        'category': ['data_analyst', 'data_engineer', 'data_scientist'],
+        'job_type': ['Full-time'] * 3,
+        'work_mode': ['Remote', 'Hybrid', 'On-site'],
+        'experience_level': ['Entry Level', 'Mid Level', 'Senior Level'],
+        'source': ['indeed'] * 3,
+        'scraped_timestamp': ['2025-08-20 00:58:52'] * 3,
+        'posted_date': ['2025-08-19'] * 3,
+    }).to_csv(tmp_path / 'data' / 'production_jobs_test.csv', index=False)
+
+    app.run()
+
+    assert not app.exception
+    assert not app.error
+    assert app.metric[0].value == '3'